@@ -0,0 +1,76 @@
+"""
+Benchmarks of the loading and export functions
+"""
+
+
+import pytest
+
+import taxidTools
+
+
+@pytest.mark.benchmark(group='load')
+def bench_read_taxdump(benchmark, track_memory, taxdump):
+    benchmark.pedantic(taxidTools.read_taxdump, args=taxdump, rounds=3)
+    track_memory(taxidTools.read_taxdump, *taxdump)
+
+
+@pytest.mark.benchmark(group='write_json')
+def bench_write_json(benchmark, track_memory, tax, tmp_path):
+    path = str(tmp_path / 'tax.json')
+    benchmark.pedantic(tax.write, args=(path,), rounds=3)
+    track_memory(tax.write, path)
+
+
+@pytest.mark.benchmark(group='load')
+def bench_read_json(benchmark, track_memory, tax, tmp_path):
+    path = str(tmp_path / 'tax.json')
+    tax.write(path)
+    benchmark.pedantic(taxidTools.read_json, args=(path,), rounds=3)
+    track_memory(taxidTools.read_json, path)
+
+
+@pytest.mark.benchmark(group='load')
+def bench_read_parquet(benchmark, track_memory, tax, tmp_path):
+    pytest.importorskip('pyarrow')
+    path = str(tmp_path / 'tax.parquet')
+    tax.to_parquet(path)
+    benchmark.pedantic(taxidTools.read_parquet, args=(path,), rounds=3)
+    track_memory(taxidTools.read_parquet, path)
+
+
+@pytest.mark.benchmark(group='copy')
+def bench_copy(benchmark, track_memory, tax):
+    benchmark.pedantic(tax.copy, rounds=3)
+    track_memory(tax.copy)
+
+
+@pytest.mark.benchmark(group='toNewick')
+def bench_toNewick(benchmark, track_memory, tax):
+    benchmark.pedantic(tax.toNewick, rounds=3)
+    track_memory(tax.toNewick)
+
+
+@pytest.mark.benchmark(group='write_newick')
+def bench_write_newick(benchmark, track_memory, tax, tmp_path):
+    path = str(tmp_path / 'tax.nwk')
+    benchmark.pedantic(tax.write_newick, args=(path,), kwargs={'nhx': True}, rounds=3)
+    track_memory(tax.write_newick, path, nhx=True)
+
+
+@pytest.mark.benchmark(group='read_newick')
+def bench_read_newick(benchmark, track_memory, tax, tmp_path):
+    path = str(tmp_path / 'tax.nwk')
+    tax.write_newick(path, nhx=True)
+    benchmark.pedantic(taxidTools.read_newick, args=(path,), rounds=3)
+    track_memory(taxidTools.read_newick, path)
+
+
+@pytest.mark.benchmark(group='from_arrays')
+def bench_from_arrays(benchmark, track_memory, tax):
+    nodes = [node for node in tax.data.values() if not isinstance(node, taxidTools.MergedNode)]
+    columns = ([node.taxid for node in nodes],
+               [node.parent.taxid if node.parent else None for node in nodes],
+               [node.rank for node in nodes],
+               [node.name for node in nodes])
+    benchmark.pedantic(taxidTools.Taxonomy.from_arrays, args=columns, rounds=3)
+    track_memory(taxidTools.Taxonomy.from_arrays, *columns)
@@ -0,0 +1,108 @@
+"""
+Benchmarks of the read-only queries
+
+Each round runs the query for a fixed sample of 1000 leaves.
+"""
+
+
+import random
+
+import pytest
+
+from taxidTools import CladeFilter, Evaluation
+
+
+@pytest.mark.benchmark(group='getAncestry')
+def bench_getAncestry(benchmark, track_memory, tax, leaves):
+    def run():
+        for taxid in leaves:
+            tax.getAncestry(taxid)
+    benchmark(run)
+    track_memory(run)
+
+
+@pytest.mark.benchmark(group='lca')
+def bench_lca(benchmark, track_memory, tax, leaves):
+    pairs = list(zip(leaves[::2], leaves[1::2]))
+
+    def run():
+        for pair in pairs:
+            tax.lca(pair)
+    benchmark(run)
+    track_memory(run)
+
+
+@pytest.mark.benchmark(group='consensus')
+@pytest.mark.parametrize('group_size', [10, 100, 1000])
+def bench_consensus(benchmark, track_memory, tax, leaves, group_size):
+    rng = random.Random(group_size)
+    groups = [rng.sample(leaves, group_size) for i in range(10)]
+
+    def run():
+        for group in groups:
+            tax.consensus(group, 0.51)
+    benchmark(run)
+    track_memory(run)
+
+
+@pytest.mark.benchmark(group='distance')
+def bench_distance(benchmark, track_memory, tax, leaves):
+    pairs = list(zip(leaves[::2], leaves[1::2]))
+
+    def run():
+        for taxid1, taxid2 in pairs:
+            tax.distance(taxid1, taxid2)
+    benchmark(run)
+    track_memory(run)
+
+
+@pytest.mark.benchmark(group='listDescendant')
+def bench_listDescendant(benchmark, track_memory, tax):
+    taxid = tax.root.taxid
+    benchmark(tax.listDescendant, taxid)
+    track_memory(tax.listDescendant, taxid)
+
+
+@pytest.mark.benchmark(group='CladeFilter')
+def bench_CladeFilter_mask(benchmark, track_memory, tax, leaves):
+    clades = sorted(child.taxid for child in tax.root.children)
+    clade_filter = CladeFilter(tax, include=clades[:1], exclude=clades[1:])
+    benchmark(clade_filter.mask, leaves)
+    track_memory(clade_filter.mask, leaves)
+
+
+@pytest.mark.benchmark(group='names')
+def bench_getTaxids(benchmark, track_memory, tax, leaves):
+    names = tax.getNames(leaves)
+    benchmark(tax.getTaxids, names)
+    track_memory(tax.getTaxids, names)
+
+
+@pytest.mark.benchmark(group='names')
+def bench_search_names(benchmark, track_memory, tax, leaves):
+    prefixes = [name[:3] for name in tax.getNames(leaves[:100])]
+
+    def run():
+        for prefix in prefixes:
+            tax.search_names(prefix, limit=10)
+    benchmark(run)
+    track_memory(run)
+
+
+@pytest.mark.benchmark(group='match_expected')
+def bench_match_expected(benchmark, track_memory, tax, leaves):
+    expected = leaves[:20]
+    benchmark(tax.match_expected, leaves, expected)
+    track_memory(tax.match_expected, leaves, expected)
+
+
+@pytest.mark.benchmark(group='Evaluation')
+def bench_Evaluation(benchmark, track_memory, tax, leaves):
+    rng = random.Random(0)
+    truth = [rng.choice(leaves[:20]) for _ in range(100 * len(leaves))]
+    predicted = [rng.choice(leaves) for _ in truth]
+
+    def run():
+        Evaluation(tax).update(predicted, truth)
+    benchmark(run)
+    track_memory(run)
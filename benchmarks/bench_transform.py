@@ -0,0 +1,39 @@
+"""
+Benchmarks of the Taxonomy transformations
+
+Transformations mutate the Taxonomy, each round works on a fresh copy
+that is excluded from the timings.
+"""
+
+
+import pytest
+
+import taxidTools
+
+
+def _largest_clade(tax):
+    """Taxid of the child of the root with the most children"""
+    return max(tax.root.children, key=lambda node: len(node.children)).taxid
+
+
+@pytest.mark.benchmark(group='prune')
+def bench_prune(benchmark, track_memory, tax):
+    taxid = _largest_clade(tax)
+    benchmark.pedantic(lambda t: t.prune(taxid),
+                       setup=lambda: ((tax.copy(),), {}),
+                       rounds=3)
+    track_memory(tax.copy().prune, taxid)
+
+
+@pytest.mark.benchmark(group='filterRanks')
+def bench_filterRanks(benchmark, track_memory, tax):
+    benchmark.pedantic(lambda t: t.filterRanks(taxidTools.linne()),
+                       setup=lambda: ((tax.copy(),), {}),
+                       rounds=3)
+    track_memory(tax.copy().filterRanks, taxidTools.linne())
+
+
+@pytest.mark.benchmark(group='subtree')
+def bench_subtree(benchmark, track_memory, tax, leaves):
+    benchmark.pedantic(tax.subtree, args=(leaves,), rounds=3)
+    track_memory(tax.subtree, leaves)
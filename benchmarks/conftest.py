@@ -0,0 +1,86 @@
+"""
+Shared fixtures for the benchmark suite
+
+Taxonomy sizes are controlled with the `TAXIDTOOLS_BENCH_SIZES`
+environment variable, a comma-separated list of node numbers.
+"""
+
+
+import os
+import random
+import tracemalloc
+
+import pytest
+
+import taxidTools
+from taxidTools.synthetic import generate_taxonomy
+
+
+# Results are stored next to the suite, whatever the working directory
+RESULTS = 'file://' + os.path.join(os.path.dirname(os.path.abspath(__file__)), '.results')
+
+SIZES = [int(size) for size in
+         os.environ.get('TAXIDTOOLS_BENCH_SIZES', '1000,10000,100000').split(',')]
+
+_cache = {}
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Unless another storage is given on the command line
+    if config.getoption('benchmark_storage') == 'file://./.benchmarks':
+        config.option.benchmark_storage = RESULTS
+
+
+def _synthetic(size):
+    if size not in _cache:
+        _cache[size] = generate_taxonomy(size, seed=size)
+    return _cache[size]
+
+
+@pytest.fixture(params=SIZES, ids=lambda size: f"size={size}")
+def size(request):
+    return request.param
+
+
+@pytest.fixture
+def tax(size):
+    """A synthetic Taxonomy, shared between benchmarks. Do not mutate."""
+    return _synthetic(size)
+
+
+@pytest.fixture
+def leaves(tax, size):
+    """A reproducible sample of species taxids"""
+    species = sorted(node.taxid for node in tax.data.values()
+                     if isinstance(node, taxidTools.Node) and not node.children)
+    return random.Random(size).choices(species, k=1000)
+
+
+@pytest.fixture
+def taxdump(tax, size, tmp_path_factory):
+    """Paths to the taxdump files of the synthetic Taxonomy"""
+    directory = tmp_path_factory.mktemp(f"taxdump{size}")
+    paths = [str(directory / name)
+             for name in ['nodes.dmp', 'rankedlineage.dmp', 'merged.dmp']]
+    tax.write_taxdump(*paths)
+    return paths
+
+
+@pytest.fixture
+def track_memory(benchmark):
+    """
+    Record the peak memory of a single call in the benchmark results
+
+    Memory is traced in a separate call, after the timing rounds,
+    so that tracing does not affect timings.
+    """
+    def track(func, *args, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            benchmark.extra_info['peak_memory_mb'] = \
+                tracemalloc.get_traced_memory()[1] / 1024 ** 2
+        finally:
+            tracemalloc.stop()
+    return track
@@ -35,5 +35,11 @@ setup(
     package_dir={"taxidTools": "taxidTools"},
     packages=packages,
     python_requires=">=3.9",
+    extras_require={
+        "arrow": ["pyarrow"],
+    },
+    entry_points={
+        "console_scripts": ["taxidtools=taxidTools.cli:main"],
+    },
     include_package_data=True,
 )
@@ -0,0 +1,258 @@
+"""
+AccessionIndex object definition
+"""
+
+
+from __future__ import annotations
+import gzip
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional, Union
+from .instrumentation import _instrumented, _n_result
+
+
+_MAGIC = b'TXACC001'
+_HEADER = struct.Struct('<8sIQ')
+_TAXID = struct.Struct('<I')
+
+
+class AccessionIndex:
+    """
+    Memory-mapped accession to taxid index
+
+    Accessions are stored in a binary file, sorted, as fixed-width records
+    followed by the taxid as a 32 bit integer. The file is memory-mapped and
+    searched by bisection, so that only the pages actually read are
+    loaded in memory, along with a small sample of the keys used to locate
+    the right block of records.
+
+    Accessions are indexed without their version, lookups ignore the
+    version of the queried accessions.
+
+    Create the index file once with `AccessionIndex.build`.
+
+    Parameters
+    ----------
+    path: str
+        Path to an index file created with `AccessionIndex.build`
+
+    See Also
+    --------
+    Taxonomy.set_accession_index
+
+    Examples
+    --------
+    >>> index = AccessionIndex.build(['nucl_gb.accession2taxid.gz'], 'nucl_gb.idx')
+    >>> index.get('NC_000001.11')
+    '9606'
+    >>> index = AccessionIndex('nucl_gb.idx')  # Later on
+    """
+
+    #: Number of records between two keys kept in memory
+    block_size = 4096
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as fi:
+            header = fi.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise ValueError(f"'{path}' is not an accession index")
+            magic, self._width, self._count = _HEADER.unpack(header)
+            if magic != _MAGIC:
+                raise ValueError(f"'{path}' is not an accession index")
+            self._map = mmap.mmap(fi.fileno(), 0, access=mmap.ACCESS_READ)
+        self._record = self._width + _TAXID.size
+        self._fence = [self._key_at(i) for i in range(0, self._count, self.block_size)]
+
+    def __enter__(self) -> AccessionIndex:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, accession: str) -> bool:
+        return self._find(accession) is not None
+
+    def __repr__(self) -> str:
+        return f"AccessionIndex('{self.path}')"
+
+    def close(self) -> None:
+        """Release the memory map"""
+        self._map.close()
+
+    def _key_at(self, i: int) -> bytes:
+        start = _HEADER.size + i * self._record
+        return self._map[start:start + self._width]
+
+    def _find(self, accession: str) -> Optional[int]:
+        """Position of an accession, or None"""
+        key = _unversioned(accession).encode()
+        if len(key) > self._width:
+            return None
+        key = key.ljust(self._width, b'\0')
+        block = bisect_right(self._fence, key) - 1
+        if block < 0:
+            return None
+        lo = block * self.block_size
+        hi = min(lo + self.block_size, self._count)
+        i = bisect_left(_Keys(self), key, lo, hi)
+        if i < hi and self._key_at(i) == key:
+            return i
+        return None
+
+    def get(self, accession: str, value: Optional[Any] = None) -> Optional[str]:
+        """
+        Get the taxid of an accession
+
+        Parameters
+        ----------
+        accession: str
+            Accession, with or without version
+        value:
+            A value to return if the accession does not exist
+
+        Returns
+        -------
+        str
+        """
+        i = self._find(accession)
+        if i is None:
+            return value
+        start = _HEADER.size + i * self._record + self._width
+        return str(_TAXID.unpack_from(self._map, start)[0])
+
+    @_instrumented('AccessionIndex.get_many', _n_result)
+    def get_many(self, accessions: Iterable[str], value: Optional[Any] = None) -> list[Optional[str]]:
+        """
+        Get the taxids of a batch of accessions
+
+        Parameters
+        ----------
+        accessions: list
+            Accessions, with or without version
+        value:
+            A value to return for accessions that do not exist
+
+        Returns
+        -------
+        list
+        """
+        get = self.get
+        return [get(accession, value) for accession in accessions]
+
+    @classmethod
+    @_instrumented('AccessionIndex.build', _n_result)
+    def build(cls, sources: Union[str, Iterable[str]], path: str,
+              chunk_size: int = 2000000) -> AccessionIndex:
+        """
+        Create an index file from accession2taxid files
+
+        Files are read in chunks that are sorted and written to temporary
+        files, which are then merged into the index, so that memory usage
+        is bound by `chunk_size`. If an accession is listed several times,
+        the first taxid is kept.
+
+        Parameters
+        ----------
+        sources: str or list
+            Paths to NCBI accession2taxid files (accession, accession.version,
+            taxid, gi), or to tab-separated files of accessions and taxids.
+            Gzipped files are supported.
+        path: str
+            Path of the index file to create
+        chunk_size: int
+            Number of lines sorted in memory at once
+
+        Returns
+        -------
+        AccessionIndex
+        """
+        if isinstance(sources, str):
+            sources = [sources]
+
+        width = 1
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(path))) as tmp:
+            runs = []
+            lines = _read_sources(sources)
+            while True:
+                chunk = list(islice(lines, chunk_size))
+                if not chunk:
+                    break
+                # Duplicates are kept in their original order
+                chunk.sort(key=lambda line: line[:line.index(b'\t')])
+                width = max(width, max(line.index(b'\t') for line in chunk))
+                run = os.path.join(tmp, f"run{len(runs)}")
+                with open(run, 'wb') as fo:
+                    fo.writelines(chunk)
+                runs.append(run)
+
+            files = [open(run, 'rb') for run in runs]
+            try:
+                with open(path, 'wb', buffering=1024 * 1024) as fo:
+                    fo.write(_HEADER.pack(_MAGIC, width, 0))
+                    count = 0
+                    previous = None
+                    pack = _TAXID.pack
+                    merged = heapq.merge(*files, key=lambda line: line[:line.index(b'\t')])
+                    for line in merged:
+                        key, taxid = line.rstrip(b'\n').split(b'\t')
+                        if key == previous:
+                            continue
+                        previous = key
+                        fo.write(key.ljust(width, b'\0') + pack(int(taxid)))
+                        count += 1
+                    fo.seek(0)
+                    fo.write(_HEADER.pack(_MAGIC, width, count))
+            finally:
+                for fi in files:
+                    fi.close()
+
+        return cls(path)
+
+
+class _Keys:
+    """Sequence view of the keys of an index, for bisection"""
+
+    def __init__(self, index: AccessionIndex) -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return self._index._count
+
+    def __getitem__(self, i: int) -> bytes:
+        return self._index._key_at(i)
+
+
+def _unversioned(accession: str) -> str:
+    """Remove the version of an accession"""
+    base, dot, version = accession.rpartition('.')
+    if dot and version.isdigit():
+        return base
+    return accession
+
+
+def _read_sources(sources: Iterable[str]) -> Iterator[bytes]:
+    """Yield b'accession\\ttaxid\\n' lines from accession2taxid files"""
+    for source in sources:
+        opener = gzip.open if source.endswith('.gz') else open
+        with opener(source, 'rb') as fi:
+            for line in fi:
+                fields = line.rstrip(b'\r\n').split(b'\t')
+                if len(fields) < 2 or not fields[0] or fields[0] == b'accession':
+                    continue
+                taxid = fields[2] if len(fields) >= 3 else fields[1]
+                if not taxid.isdigit():
+                    continue
+                accession = fields[0]
+                base, dot, version = accession.rpartition(b'.')
+                if dot and version.isdigit():
+                    accession = base
+                yield accession + b'\t' + taxid + b'\n'
@@ -0,0 +1,173 @@
+"""
+CladeFilter object definition
+"""
+
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional, Union
+from .Node import _BaseNode
+from .instrumentation import _instrumented, _n_result
+
+if TYPE_CHECKING:
+    from .Taxonomy import Taxonomy
+
+
+class CladeFilter:
+    """
+    Fast clade membership filter
+
+    Nodes of the Taxonomy are numbered in pre-order, so that each clade
+    covers a contiguous range of indexes. Membership of every Node is
+    precomputed once in a bitmap, after which testing a taxid is a single
+    lookup regardless of the number of clades and of the depth of the tree.
+
+    When clades are nested, the smallest clade containing a Node decides
+    whether it is kept, e.g. excluding Homo sapiens while including
+    Vertebrata. Nodes outside of all clades are kept only if no clades
+    are included.
+
+    Parameters
+    ----------
+    taxonomy: taxidTools.Taxonomy
+        Taxonomy to filter on
+    include: list, optional
+        Taxids of the clades to keep
+    exclude: list, optional
+        Taxids of the clades to discard
+    missing: bool
+        Result for taxids absent from the Taxonomy
+
+    Raises
+    ------
+    taxidTools.InvalidNodeError
+        If a clade taxid is not in the Taxonomy
+
+    Notes
+    -----
+    The filter is a snapshot of the Taxonomy when it is created and does
+    not reflect later modifications. Merged taxids are resolved.
+
+    Examples
+    --------
+    >>> vertebrates = CladeFilter(tax, include=['7742'], exclude=['9606'])
+    >>> '9913' in vertebrates
+    True
+    >>> vertebrates.mask(['9913', '9606', '6239'])
+    [True, False, False]
+    >>> list(vertebrates.filter(hits, key=lambda hit: hit.taxid))
+    """
+
+    @_instrumented('CladeFilter.__init__')
+    def __init__(self, taxonomy: Taxonomy,
+                 include: Optional[Iterable[Union[str, int]]] = None,
+                 exclude: Optional[Iterable[Union[str, int]]] = None,
+                 missing: bool = False) -> None:
+        include = [taxonomy[str(taxid)] for taxid in include or []]
+        exclude = [taxonomy[str(taxid)] for taxid in exclude or []]
+        self.missing = missing
+
+        # Pre-order numbering, the clade of a Node spans
+        # from its index to its index plus its size
+        order = []
+        stack = [node for node in taxonomy.data.values()
+                 if isinstance(node, _BaseNode) and node._parent is None]
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            stack.extend(node._children)
+        index = {node._taxid: i for i, node in enumerate(order)}
+        sizes = [1] * len(order)
+        for i in range(len(order) - 1, 0, -1):
+            parent = order[i]._parent
+            if parent is not None:
+                sizes[index[parent._taxid]] += sizes[i]
+
+        # Larger clades first, so that nested clades override them
+        clades = [(node, True) for node in include] + [(node, False) for node in exclude]
+        clades.sort(key=lambda clade: -sizes[index[clade[0]._taxid]])
+        bits = bytearray([0 if include else 1]) * len(order)
+        for node, keep in clades:
+            start = index[node._taxid]
+            end = start + sizes[start]
+            bits[start:end] = (b'\x01' if keep else b'\x00') * (end - start)
+
+        for old in taxonomy._merged:
+            new = taxonomy._resolve_merged(old)
+            if new in index:
+                index[old] = index[new]
+
+        self._index = index
+        self._bits = bits
+
+    def __len__(self) -> int:
+        return len(self._bits)
+
+    def __contains__(self, taxid: Union[str, int]) -> bool:
+        i = self._index.get(taxid)
+        if i is None:
+            i = self._index.get(str(taxid))
+            if i is None:
+                return self.missing
+        return self._bits[i] == 1
+
+    @_instrumented('CladeFilter.mask', _n_result)
+    def mask(self, taxids: Iterable[Union[str, int]]) -> list[bool]:
+        """
+        Membership of a batch of taxids
+
+        Parameters
+        ----------
+        taxids: list
+            Taxids to test
+
+        Returns
+        -------
+        list
+            A list of booleans, True for the taxids to keep
+        """
+        index = self._index
+        bits = self._bits
+        missing = self.missing
+        result = []
+        append = result.append
+        for taxid in taxids:
+            i = index.get(taxid)
+            if i is None:
+                i = index.get(str(taxid))
+                if i is None:
+                    append(missing)
+                    continue
+            append(bits[i] == 1)
+        return result
+
+    def filter(self, iterable: Iterable,
+               key: Optional[Callable[[Any], Union[str, int]]] = None) -> Iterator:
+        """
+        Lazily filter a stream of items
+
+        Parameters
+        ----------
+        iterable: iterable
+            Taxids, or any items if `key` is provided
+        key: callable, optional
+            Function returning the taxid of an item
+
+        Returns
+        -------
+        iterator
+            The items to keep, in their original order
+        """
+        index = self._index
+        bits = self._bits
+        missing = self.missing
+        for item in iterable:
+            taxid = item if key is None else key(item)
+            i = index.get(taxid)
+            if i is None:
+                i = index.get(str(taxid))
+                if i is None:
+                    if missing:
+                        yield item
+                    continue
+            if bits[i]:
+                yield item
@@ -0,0 +1,252 @@
+"""
+Evaluation object definition
+"""
+
+
+from __future__ import annotations
+from collections import Counter
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Iterable, Optional, Union
+from .Node import _BaseNode
+from .exceptions import InvalidNodeError
+from .instrumentation import _instrumented, _n_result
+from .utils import linne
+
+if TYPE_CHECKING:
+    from .Taxonomy import Taxonomy
+
+
+_CORRECT, _TOO_SHALLOW, _INCORRECT, _UNCLASSIFIED = range(4)
+_CATEGORIES = ('correct', 'too_shallow', 'incorrect', 'unclassified')
+
+
+class Evaluation:
+    """
+    Rank-resolved evaluation of taxonomic classifications
+
+    Predicted taxids are compared to the true taxids at each of the
+    requested ranks, after projecting both to their ancestor at this
+    rank. At each rank, every classification with a true ancestor
+    at this rank falls in one of four categories:
+
+    * correct: the prediction has the same ancestor as the truth
+    * too_shallow: the prediction is an ancestor of the true Node above
+      this rank, it is correct but not resolved enough
+    * incorrect: the prediction is not on the lineage of the truth
+    * unclassified: there is no prediction
+
+    Classifications whose truth has no ancestor at a rank are not
+    counted at this rank.
+
+    Input is consumed in batches: identical (prediction, truth) pairs
+    of a batch are counted once, and the projection of each Node is
+    computed once and reused, so that memory is bound by the batch size
+    and by the number of distinct Nodes seen.
+
+    Parameters
+    ----------
+    taxonomy: taxidTools.Taxonomy
+        Taxonomy of the predicted and true taxids
+    ranks: list, optional
+        Ranks to evaluate, defaults to `linne()`
+    unclassified: iterable, optional
+        Predicted values marking unclassified reads
+    ignore_missing: bool
+        If True, reads with a true taxid absent from the Taxonomy are
+        skipped and predictions absent from the Taxonomy are counted as
+        unclassified. If False (default), will raise an Error on
+        missing taxids.
+    batch_size: int
+        Number of reads processed at once
+
+    Examples
+    --------
+    >>> evaluation = Evaluation(tax, ranks=['species', 'genus'])
+    >>> evaluation.update(['9913', '9903', '9606'], ['9913', '9913', '9913'])
+    >>> evaluation.counts()['species']
+    {'correct': 1, 'too_shallow': 1, 'incorrect': 1, 'unclassified': 0}
+    >>> evaluation.metrics()['genus']['precision']
+    0.6666666666666666
+    """
+
+    def __init__(self, taxonomy: Taxonomy,
+                 ranks: Optional[list[str]] = None,
+                 unclassified: Iterable[Any] = (0, '0', None, ''),
+                 ignore_missing: bool = False,
+                 batch_size: int = 1000000) -> None:
+        self.taxonomy = taxonomy
+        self.ranks = list(linne() if ranks is None else ranks)
+        self.unclassified = set(unclassified)
+        self.ignore_missing = ignore_missing
+        self.batch_size = batch_size
+        self._positions = {}
+        for i, rank in enumerate(self.ranks):
+            self._positions.setdefault(rank, []).append(i)
+        self._counts = [[0] * len(_CATEGORIES) for _ in self.ranks]
+        self._reads = 0
+        # Node to (ancestor at each rank, depth), for a generation of the Taxonomy
+        self._projections = {}
+        self._generation = taxonomy.generation
+
+    def __len__(self) -> int:
+        """Number of reads evaluated"""
+        return self._reads
+
+    def _project(self, node: _BaseNode) -> tuple[tuple, int]:
+        """Ancestors of a Node at each rank and depth of the Node, memoized"""
+        memo = self._projections
+        path = []
+        current = node
+        while current is not None and current not in memo:
+            path.append(current)
+            current = current._parent
+        if current is None:
+            row, depth = (None,) * len(self.ranks), -1
+        else:
+            row, depth = memo[current]
+        positions = self._positions
+        for current in reversed(path):
+            # The highest Node of a rank wins, as in Lineage.filter
+            for i in positions.get(current._rank, ()):
+                if row[i] is None:
+                    row = row[:i] + (current,) + row[i + 1:]
+            depth += 1
+            memo[current] = (row, depth)
+        return memo[node]
+
+    def _outcome(self, predicted: Optional[_BaseNode], truth: _BaseNode) -> tuple:
+        """Category of a classification at each rank, None if not evaluated"""
+        true_row, true_depth = self._project(truth)
+        if predicted is None:
+            return tuple(None if ancestor is None else _UNCLASSIFIED for ancestor in true_row)
+
+        predicted_row, predicted_depth = self._project(predicted)
+        on_lineage = None
+        outcome = []
+        for expected, observed in zip(true_row, predicted_row):
+            if expected is None:
+                outcome.append(None)
+            elif observed is expected:
+                outcome.append(_CORRECT)
+            elif observed is not None:
+                outcome.append(_INCORRECT)
+            else:
+                if on_lineage is None:
+                    # Is the prediction an ancestor of the truth?
+                    current = truth
+                    for _ in range(true_depth - predicted_depth):
+                        current = current._parent
+                    on_lineage = current is predicted
+                outcome.append(_TOO_SHALLOW if on_lineage else _INCORRECT)
+        return tuple(outcome)
+
+    @_instrumented('Evaluation.update', _n_result)
+    def update(self, predicted: Iterable[Union[str, int]],
+               truth: Iterable[Union[str, int]]) -> int:
+        """
+        Add classifications to the evaluation
+
+        Parameters
+        ----------
+        predicted: iterable
+            Predicted taxid of each read. Iterables are consumed once
+            and do not need to fit in memory.
+        truth: iterable
+            True taxid of each read, aligned with `predicted`
+
+        Returns
+        -------
+        int
+            Number of reads added
+
+        Raises
+        ------
+        taxidTools.InvalidNodeError
+            If a taxid is not in the Taxonomy and `ignore_missing` is `False`
+        """
+        if self._generation != self.taxonomy.generation:
+            # The Taxonomy was modified
+            self._projections.clear()
+            self._generation = self.taxonomy.generation
+        pairs = zip(predicted, truth)
+        added = 0
+        while True:
+            batch = Counter(islice(pairs, self.batch_size))
+            if not batch:
+                break
+            added += self._update_batch(batch)
+        self._reads += added
+        return added
+
+    def _update_batch(self, batch: Counter) -> int:
+        """Add a batch of counted (prediction, truth) pairs"""
+        taxonomy = self.taxonomy
+        unclassified = self.unclassified
+        taxids = {taxid for pair in batch for taxid in pair if taxid not in unclassified}
+        nodes = dict(zip(taxids, taxonomy._iter_nodes(taxids)))
+
+        added = 0
+        counts = self._counts
+        outcomes = {}
+        for (predicted, truth), n in batch.items():
+            true_node = None if truth in unclassified else nodes[truth]
+            if true_node is None:
+                if self.ignore_missing:
+                    continue
+                raise InvalidNodeError(f"There is no Node with taxid '{truth}' in this Taxonomy")
+            if predicted in unclassified:
+                predicted_node = None
+            else:
+                predicted_node = nodes[predicted]
+                if predicted_node is None and not self.ignore_missing:
+                    raise InvalidNodeError(f"There is no Node with taxid '{predicted}' in this Taxonomy")
+
+            key = (predicted_node, true_node)
+            outcome = outcomes.get(key)
+            if outcome is None:
+                outcome = outcomes[key] = self._outcome(predicted_node, true_node)
+            for i, category in enumerate(outcome):
+                if category is not None:
+                    counts[i][category] += n
+            added += n
+        return added
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        """
+        Classification counts per rank and category
+
+        Returns
+        -------
+        dict
+            A dictionnary of ranks to dictionnaries of 'correct',
+            'too_shallow', 'incorrect' and 'unclassified' counts
+        """
+        return {rank: dict(zip(_CATEGORIES, counts))
+                for rank, counts in zip(self.ranks, self._counts)}
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """
+        Precision, recall and F1 score per rank
+
+        At each rank, precision is the fraction of correct predictions
+        among the predictions resolved at this rank (correct and
+        incorrect), recall is the fraction of correct predictions among
+        all the reads evaluated at this rank.
+
+        Returns
+        -------
+        dict
+            A dictionnary of ranks to dictionnaries of the counts
+            (see `Evaluation.counts`) and 'precision', 'recall' and 'f1'.
+            Undefined metrics are 0.
+        """
+        result = {}
+        for rank, counts in self.counts().items():
+            correct = counts['correct']
+            resolved = correct + counts['incorrect']
+            total = sum(counts.values())
+            precision = correct / resolved if resolved else 0.0
+            recall = correct / total if total else 0.0
+            f1 = 2 * precision * recall / (precision + recall) if correct else 0.0
+            result[rank] = dict(counts, precision=precision, recall=recall, f1=f1)
+        return result
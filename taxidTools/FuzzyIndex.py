@@ -0,0 +1,237 @@
+"""
+FuzzyIndex object definition
+"""
+
+
+from __future__ import annotations
+import base64
+import json
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Iterable, Optional
+from .NameIndex import normalize_name
+
+
+class FuzzyIndex:
+    """
+    Approximate name matching index
+
+    Names are indexed by their character trigrams. A query only
+    considers names sharing enough trigrams with it to be within the
+    maximal edit distance, the edit distance is then computed for these
+    candidates only. Queries too short for this bound are compared to
+    all the names of a compatible length.
+
+    Names are numbered by increasing length, so that the part of each
+    trigram posting list with names of a compatible length is found
+    by bisection.
+
+    Names are expected to be normalized (see `normalize_name`),
+    queries are normalized before matching.
+
+    Parameters
+    ----------
+    names: list
+        Names to index
+
+    Examples
+    --------
+    >>> index = FuzzyIndex(['gallus gallus', 'bos taurus'])
+    >>> index.search('Gallus galus')
+    [('gallus gallus', 1)]
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._names = sorted(names, key=len)
+        self._postings = {}
+        self._offsets = []
+        postings = self._postings
+        for i, name in enumerate(self._names):
+            for gram in _trigrams(name):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                posting.append(i)
+        self._index_lengths()
+
+    def _index_lengths(self) -> None:
+        """Index of the first name of each length"""
+        offsets = self._offsets = []
+        for i, name in enumerate(self._names):
+            while len(offsets) <= len(name):
+                offsets.append(i)
+        offsets.append(len(self._names))
+
+    def _id_range(self, shortest: int, longest: int) -> tuple[int, int]:
+        """First and last name ids for a range of name lengths"""
+        offsets = self._offsets
+        if not offsets:
+            return 0, 0
+        shortest = min(max(shortest, 0), len(offsets) - 1)
+        longest = min(max(longest + 1, 0), len(offsets) - 1)
+        return offsets[shortest], offsets[longest]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __sizeof__(self) -> int:
+        getsizeof = sys.getsizeof
+        return object.__sizeof__(self) + getsizeof(self._names) + getsizeof(self._postings) \
+            + sum(getsizeof(posting) for posting in self._postings.values())
+
+    def search(self, query: str, max_distance: int = 2,
+               limit: Optional[int] = None) -> list[tuple[str, int]]:
+        """
+        Find the names within an edit distance of a query
+
+        Parameters
+        ----------
+        query: str
+            Name to look up
+        max_distance: int
+            Maximal Levenshtein distance between the query and the names
+        limit: int, optional
+            Maximal number of results
+
+        Returns
+        -------
+        list
+            (name, distance) tuples, closest names first
+        """
+        query = normalize_name(query)
+        grams = _trigrams(query)
+        if not grams:
+            return []
+
+        # Each edit destroys at most 3 trigrams, so that a match shares
+        # at least `threshold` trigrams with the query. Skipping the
+        # `skip` most frequent trigrams, it still shares `threshold - skip`
+        # of the others.
+        bound = len(grams) - 3 * max_distance
+        threshold = max(1, bound)
+        skip = (threshold - 1) // 2
+        length = len(query)
+        first, last = self._id_range(length - max_distance, length + max_distance)
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is not None:
+                postings.append(posting[bisect_left(posting, first):bisect_left(posting, last)])
+        postings.sort(key=len)
+        shared_grams = Counter()
+        for posting in postings[:len(grams) - skip]:
+            shared_grams.update(posting)
+        threshold -= skip
+        if bound > 0:
+            candidates = shared_grams.items()
+        else:
+            # Short queries can match names sharing no trigram with them,
+            # all the names of a compatible length are checked
+            candidates = ((i, shared_grams[i]) for i in range(first, last))
+            threshold = 0
+
+        names = self._names
+        results = []
+        for i, shared in candidates:
+            if shared < threshold:
+                continue
+            name = names[i]
+            distance = _levenshtein(query, name, max_distance)
+            if distance <= max_distance:
+                results.append((distance, -shared, name))
+        results.sort()
+        return [(name, distance) for distance, _, name in results[:limit]]
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to a file
+
+        Parameters
+        ----------
+        path: str
+            File path for the output
+
+        See Also
+        --------
+        FuzzyIndex.load
+        """
+        postings = {gram: base64.b64encode(posting.tobytes()).decode('ascii')
+                    for gram, posting in self._postings.items()}
+        with open(path, 'w') as fi:
+            json.dump({'byteorder': sys.byteorder,
+                       'itemsize': array('I').itemsize,
+                       'names': self._names,
+                       'postings': postings}, fi)
+
+    @classmethod
+    def load(cls, path: str) -> FuzzyIndex:
+        """
+        Read an index written with `FuzzyIndex.save`
+
+        Parameters
+        ----------
+        path: str
+            Path of the file to load
+
+        Returns
+        -------
+        FuzzyIndex
+        """
+        with open(path, 'r') as fi:
+            content = json.load(fi)
+        if content['itemsize'] != array('I').itemsize:
+            raise ValueError(f"Cannot load the index written in '{path}' on this platform")
+        swap = content['byteorder'] != sys.byteorder
+        index = cls()
+        index._names = content['names']
+        index._index_lengths()
+        for gram, data in content['postings'].items():
+            posting = array('I')
+            posting.frombytes(base64.b64decode(data))
+            if swap:
+                posting.byteswap()
+            index._postings[gram] = posting
+        return index
+
+
+def _trigrams(name: str) -> set[str]:
+    """Set of the trigrams of a name, padded with two spaces"""
+    padded = f"  {name}  "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)} if name else set()
+
+
+def _levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Edit distance between two strings
+
+    Only the diagonal band of width `2 * max_distance + 1` is computed,
+    and `max_distance + 1` is returned as soon as the distance is known
+    to exceed `max_distance`.
+    """
+    if a == b:
+        return 0
+    too_far = max_distance + 1
+    len_b = len(b)
+    if abs(len(a) - len_b) > max_distance:
+        return too_far
+    previous = [j if j <= max_distance else too_far for j in range(len_b + 1)]
+    for i, char in enumerate(a, 1):
+        current = [too_far] * (len_b + 1)
+        best = current[0] = i if i <= max_distance else too_far
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            cost = previous[j - 1] + (char != b[j - 1])
+            if previous[j] < cost:
+                cost = previous[j] + 1
+            if current[j - 1] < cost:
+                cost = current[j - 1] + 1
+            if cost > too_far:
+                cost = too_far
+            current[j] = cost
+            if cost < best:
+                best = cost
+        if best > max_distance:
+            return too_far
+        previous = current
+    return previous[len_b]
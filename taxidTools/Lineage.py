@@ -8,6 +8,7 @@ from typing import Optional
 from collections import UserList
 from .Node import Node, DummyNode, _BaseNode, MergedNode
 from .utils import linne
+from .instrumentation import _instrumented, _n_self
 
 
 class Lineage(UserList):
@@ -64,16 +65,22 @@ class Lineage(UserList):
 
         self._baseNode = base_node
 
-        vec = [base_node]
-
-        while vec[-1].parent:
-            vec.append(vec[-1].parent)
+        # Walk up the private parent attribute, skipping the property lookups
+        vec = []
+        node = base_node
+        if isinstance(node, MergedNode):
+            vec.append(node)
+            node = None
+        while node is not None:
+            vec.append(node)
+            node = node._parent
 
         self.data = vec
 
         if not ascending:
             self.reverse()
 
+    @_instrumented('Lineage.filter', _n_self)
     def filter(self, ranks: Optional[list[str]] = linne()) -> None:
         """
         Filter a Lineage to a set of specified ranks.
@@ -95,6 +102,9 @@ class Lineage(UserList):
         still point to the original parent Node,
         even if it was masked in the Lineage.
 
+        Missing ranks are filled with new DummyNodes, which are not
+        linked to any other Node.
+
         Examples
         --------
         >>> root = Node(1, "root", "root")
@@ -111,14 +121,19 @@ class Lineage(UserList):
         >>> lin.filter(["root", "sub_child_rank"])
         Lineage([Node(1), Node(3)])
         """
-        nodedict = {node.rank: node for node in self if node.rank in ranks}
+        wanted = set(ranks)
+        nodedict = {}
+        for node in self.data:
+            if node._rank in wanted:
+                nodedict[node._rank] = node
 
         new = []
         for rank in ranks:
-            try:
-                new.append(nodedict[rank])
-            except KeyError:
-                new.append(DummyNode(rank=rank))
+            node = nodedict.get(rank)
+            if node is None:
+                # Repeated ranks share their placeholder
+                node = nodedict[rank] = DummyNode(rank=rank)
+            new.append(node)
 
         self.data = new
 
@@ -0,0 +1,316 @@
+"""
+NameIndex object definition
+"""
+
+
+from __future__ import annotations
+import sys
+from bisect import bisect_left
+from typing import Iterable, Iterator, Mapping, Optional, Union
+from .Node import _BaseNode
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalize a name for lookups
+
+    Whitespaces are collapsed and stripped, and the name is casefolded.
+
+    Examples
+    --------
+    >>> normalize_name('  Bos   Taurus ')
+    'bos taurus'
+    """
+    return ' '.join(name.split()).casefold()
+
+
+SCIENTIFIC_NAME = 'scientific name'
+
+
+class NameIndex:
+    """
+    Index of Node names to taxids
+
+    Names are indexed by their normalized form (see `normalize_name`),
+    and a name can point to several taxids.
+    Entries are validated against the current Nodes on lookup, so that
+    removed or renamed Nodes are never returned.
+
+    Besides the names of the Nodes themselves ('scientific name'), other
+    name classes such as synonyms or common names can be indexed with
+    `NameIndex.add_name`. Each class is stored in its own dictionnary,
+    lookups are a single dictionnary access per class.
+
+    Each entry holds a single taxid, or a tuple of taxids for homonyms.
+    The sorted list of names used for prefix queries is only built on
+    the first query.
+
+    Parameters
+    ----------
+    nodes: dict, optional
+        Nodes to index, by taxid. MergedNodes and Nodes without
+        name are skipped.
+    """
+
+    def __init__(self, nodes: Optional[Mapping[str, _BaseNode]] = None) -> None:
+        self._keys = {}
+        self._classes = {}
+        self._sorted = None
+        if nodes:
+            add = self.add
+            for taxid, node in nodes.items():
+                if isinstance(node, _BaseNode) and node._name:
+                    add(node._name, taxid)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __sizeof__(self) -> int:
+        size = object.__sizeof__(self) + sys.getsizeof(self._keys)
+        size += sum(sys.getsizeof(keys) for keys in self._classes.values())
+        if self._sorted is not None:
+            size += sys.getsizeof(self._sorted)
+        return size
+
+    @property
+    def name_classes(self) -> list[str]:
+        """Indexed name classes"""
+        return [SCIENTIFIC_NAME] + list(self._classes)
+
+    def keys(self) -> Iterator[str]:
+        """Distinct normalized names, for all classes"""
+        seen = set(self._keys)
+        yield from self._keys
+        for keys in self._classes.values():
+            for key in keys:
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+
+    def items(self) -> Iterator[tuple[str, Union[str, tuple[str, ...]]]]:
+        """Normalized names and their taxid or tuple of taxids, for all classes"""
+        yield from self._keys.items()
+        for keys in self._classes.values():
+            yield from keys.items()
+
+    def add(self, name: str, taxid: str) -> None:
+        """
+        Index a name
+
+        Parameters
+        ----------
+        name: str
+            Node name
+        taxid: str
+            Taxid of the Node
+        """
+        key = normalize_name(name)
+        if key == name:
+            # Keep a single copy of the string
+            key = name
+        if _insert(self._keys, key, taxid):
+            self._sorted = None
+
+    def update(self, names: Iterable[tuple[Optional[str], str]]) -> None:
+        """
+        Index names in bulk
+
+        Parameters
+        ----------
+        names: iterable
+            (name, taxid) pairs, pairs without name are skipped
+        """
+        keys = self._keys
+        for name, taxid in names:
+            if not name:
+                continue
+            key = ' '.join(name.split()).casefold()
+            if key == name:
+                key = name
+            if key not in keys:
+                keys[key] = taxid
+            else:
+                _insert(keys, key, taxid)
+        self._sorted = None
+
+    def add_name(self, name: str, taxid: str, name_class: str) -> None:
+        """
+        Index a name of a given class
+
+        Parameters
+        ----------
+        name: str
+            Name, e.g. a synonym of the Node
+        taxid: str
+            Taxid of the Node
+        name_class: str
+            Name class, e.g. 'synonym' or 'common name'.
+            Scientific names are indexed as Node names.
+        """
+        if name_class == SCIENTIFIC_NAME:
+            self.add(name, taxid)
+            return
+        keys = self._classes.get(name_class)
+        if keys is None:
+            keys = self._classes[name_class] = {}
+        _insert(keys, normalize_name(name), taxid)
+
+    def extend(self, other: NameIndex,
+               nodes: Optional[Mapping[str, _BaseNode]] = None) -> None:
+        """
+        Add the names of other classes than scientific names from another index
+
+        Parameters
+        ----------
+        other: NameIndex
+            Index to copy names from
+        nodes: dict, optional
+            If provided, only names of these Nodes are copied
+        """
+        for name_class, other_keys in other._classes.items():
+            keys = self._classes.get(name_class)
+            if keys is None and nodes is None:
+                self._classes[name_class] = dict(other_keys)
+                continue
+            if keys is None:
+                keys = self._classes[name_class] = {}
+            for key, current in other_keys.items():
+                for taxid in (current,) if isinstance(current, str) else current:
+                    if nodes is None or taxid in nodes:
+                        _insert(keys, key, taxid)
+
+    def discard(self, name: str, taxid: str) -> None:
+        """
+        Remove a name of a taxid from the index, if present
+        """
+        key = normalize_name(name)
+        current = self._keys.get(key)
+        if current is None:
+            return
+        if isinstance(current, str):
+            if current == taxid:
+                del self._keys[key]
+                self._sorted = None
+            return
+        remaining = tuple(t for t in current if t != taxid)
+        self._keys[key] = remaining[0] if len(remaining) == 1 else remaining
+
+    def get(self, name: str, nodes: Mapping[str, _BaseNode],
+            name_class: Optional[str] = None) -> list[str]:
+        """
+        All taxids with a given name
+
+        Node names come first, exact matches before the other taxids
+        matching after normalization, then the matches in other name
+        classes, in the order the classes were added.
+
+        Parameters
+        ----------
+        name: str
+            Name to look up
+        nodes: dict
+            Current Nodes, by taxid, used to validate entries
+        name_class: str, optional
+            Only look up names of this class
+
+        Returns
+        -------
+        list
+        """
+        key = normalize_name(name)
+        result = []
+        if name_class is None or name_class == SCIENTIFIC_NAME:
+            current = self._keys.get(key)
+            if current is not None:
+                if isinstance(current, str):
+                    current = (current,)
+                other = []
+                for taxid in current:
+                    node = nodes.get(taxid)
+                    if not isinstance(node, _BaseNode) or not node._name:
+                        continue
+                    if node._name == name:
+                        result.append(taxid)
+                    elif node._name == key or normalize_name(node._name) == key:
+                        other.append(taxid)
+                result.extend(other)
+            if name_class is not None:
+                return result
+
+        if name_class is None:
+            classes = self._classes.values()
+        elif name_class in self._classes:
+            classes = [self._classes[name_class]]
+        else:
+            classes = []
+        for keys in classes:
+            current = keys.get(key)
+            if current is None:
+                continue
+            for taxid in (current,) if isinstance(current, str) else current:
+                if isinstance(nodes.get(taxid), _BaseNode) and taxid not in result:
+                    result.append(taxid)
+        return result
+
+    def first(self, name: str, nodes: Mapping[str, _BaseNode],
+              name_class: Optional[str] = None) -> Optional[str]:
+        """
+        Preferred taxid for a name, or None
+
+        See `NameIndex.get`
+        """
+        taxids = self.get(name, nodes, name_class)
+        return taxids[0] if taxids else None
+
+    def prefix(self, prefix: str, nodes: Mapping[str, _BaseNode],
+               limit: Optional[int] = None) -> list[tuple[str, str]]:
+        """
+        Node names starting with a prefix
+
+        Parameters
+        ----------
+        prefix: str
+            Beginning of the name, matched after normalization
+        nodes: dict
+            Current Nodes, by taxid, used to validate entries
+        limit: int, optional
+            Maximal number of results
+
+        Returns
+        -------
+        list
+            (name, taxid) tuples, sorted by normalized name
+        """
+        keys = self._sorted
+        if keys is None:
+            keys = self._sorted = sorted(self._keys)
+        key = normalize_name(prefix)
+        if key and prefix[-1:].isspace():
+            # A trailing space marks the end of a word
+            key += ' '
+
+        result = []
+        for i in range(bisect_left(keys, key), len(keys)):
+            if not keys[i].startswith(key):
+                break
+            for taxid in self.get(keys[i], nodes, SCIENTIFIC_NAME):
+                result.append((nodes[taxid]._name, taxid))
+                if limit is not None and len(result) >= limit:
+                    return result
+        return result
+
+
+def _insert(keys: dict, key: str, taxid: str) -> bool:
+    """
+    Add a taxid to an entry, returns True if the key is new
+    """
+    current = keys.get(key)
+    if current is None:
+        keys[key] = taxid
+        return True
+    if isinstance(current, str):
+        if current != taxid:
+            keys[key] = (current, taxid)
+    elif taxid not in current:
+        keys[key] = current + (taxid,)
+    return False
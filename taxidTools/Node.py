@@ -499,3 +499,11 @@ class MergedNode:
     @new_node.setter
     def new_node(self, new_node: Union[str, int]) -> None:
         self._new_node = str(new_node)
+
+    def _to_dict(self):
+        """
+        Create a dict of self with information to recreate the object.
+        """
+        dic = dict(self.__dict__)
+        dic['type'] = self.__class__.__name__
+        return dic
@@ -4,14 +4,24 @@ Taxonomy object definition
 
 
 from __future__ import annotations
-from typing import Union, Iterator, Optional, Any
+from typing import Union, Callable, Iterator, Iterable, Mapping, Optional, Any, Sequence, TextIO
 from collections import UserDict, Counter
+from itertools import count, islice, repeat
 from copy import copy, deepcopy
+import csv
+import io
 import json
+import re
+import sys
+import threading
 from .Node import Node, DummyNode, _BaseNode, MergedNode
 from .Lineage import Lineage
-from .utils import linne, _deprecation
-from .exceptions import InvalidNodeError
+from .NameIndex import NameIndex
+from .FuzzyIndex import FuzzyIndex
+from .AccessionIndex import AccessionIndex
+from .utils import linne, _deprecation, _optional_import, _gc_paused
+from .exceptions import InvalidNodeError, TaxonomyError, FrozenTaxonomyError
+from .instrumentation import _instrumented, _n_result, _n_arg, _n_self, get_stats
 
 
 class Taxonomy(UserDict):
@@ -88,12 +98,18 @@ class Taxonomy(UserDict):
     """
 
     def __init__(self, *args, **kwargs) -> None:
+        # modification counter, see Taxonomy.generation
+        self._generation = 0
+        # derived data computed on first use, cleared on modifications:
+        # root, resolved merge chains and fuzzy name matching index
+        self._derived = {}
+        # merged taxids to their new taxid as given, filled by __setitem__
+        self._merged = {}
+        # name index for backward lookup, filled by __setitem__
+        self._names = NameIndex()
+        # optional accession to taxid index, see set_accession_index
+        self._accessions = None
         super().__init__(*args, **kwargs)
-        # create name dict for backward lookup
-        self._namedict = {}
-        for k, v in self.items():
-            if v.name:
-                self._namedict[v.name] = k
 
     def __getitem__(self, key: str) -> Node:
         """
@@ -102,16 +118,94 @@ class Taxonomy(UserDict):
         Overloading default behavior to:
         - return a specific error on non-existing key
         - handle MergedNodes to return the new node
+        - look up unknown keys in the accession index, if any
         """
         try:
-            node = super().__getitem__(key)
+            node = self.data[key]
         except KeyError:
+            if self._accessions is not None and isinstance(key, str):
+                taxid = self._accessions.get(key)
+                if taxid is not None and taxid != key:
+                    return self[taxid]
             raise InvalidNodeError(f"There is no Node with taxid '{key}' in this Taxonomy")
         if isinstance(node, MergedNode):
-            # call to getitem in case new_node was merged too
-            return self.__getitem__(node.new_node)
+            target = self._resolve_merged(key)
+            try:
+                return self.data[target]
+            except KeyError:
+                raise InvalidNodeError(
+                    f"Taxid '{key}' was merged into '{target}', "
+                    f"which is not in this Taxonomy")
         return node
 
+    def __setitem__(self, key: str, node: Union[_BaseNode, MergedNode]) -> None:
+        """
+        Element setter with brackets
+
+        Overloading default behavior to keep the merged taxid
+        redirect table and the name index up to date.
+        """
+        self.data[key] = node
+        self._touch()
+        if isinstance(node, MergedNode):
+            self._merged[key] = node.new_node
+        else:
+            self._merged.pop(key, None)
+            if node._name:
+                self._names.add(node._name, key)
+
+    def __delitem__(self, key: str) -> None:
+        node = self.data.pop(key)
+        self._touch()
+        self._merged.pop(key, None)
+        if isinstance(node, _BaseNode) and node._name:
+            self._names.discard(node._name, key)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == 'data':
+            # Replacing the data store is a modification
+            self._touch()
+
+    def _touch(self) -> None:
+        """
+        Record a modification of the Taxonomy
+
+        Derived data is discarded, to be recomputed on next use.
+        """
+        self._generation += 1
+        self._derived.clear()
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Derived data, computed once per generation of the Taxonomy
+        """
+        derived = self._derived
+        if key not in derived:
+            derived[key] = compute()
+        return derived[key]
+
+    @property
+    def generation(self) -> int:
+        """
+        Modification counter
+
+        Incremented by every modification of the Taxonomy: adding or
+        removing Nodes, `prune`, `filterRanks` or replacing `data`.
+        Data derived from the Taxonomy can be tagged with the generation
+        it was computed from, and recomputed when it changes.
+
+        The root, the resolved chains of merged taxids and the fuzzy name
+        matching index are cached this way. The name index is updated
+        along with the Nodes instead.
+
+        Notes
+        -----
+        Modifying the Node objects directly, e.g. setting their parent,
+        is not tracked.
+        """
+        return self._generation
+
     def __repr__(self):
         return f"{set(self.values())}"
 
@@ -144,6 +238,169 @@ class Taxonomy(UserDict):
 
         return cls(as_dict)
 
+    @classmethod
+    @_instrumented('Taxonomy.from_arrays', _n_result)
+    @_gc_paused
+    def from_arrays(cls, taxids: Sequence[Union[str, int]],
+                    parent_taxids: Sequence[Optional[Union[str, int]]],
+                    ranks: Sequence[Optional[str]],
+                    names: Sequence[Optional[str]],
+                    merged: Optional[Union[Mapping[Union[str, int], Union[str, int]],
+                                           Iterable[tuple[Union[str, int], Union[str, int]]]]] = None,
+                    types: Optional[Sequence[type]] = None) -> Taxonomy:
+        """
+        Create a Taxonomy object from columns of Node attributes
+
+        The input is validated in bulk, then Nodes are created, linked
+        to their parent and added to the name index in a single pass,
+        without going through the Node setters and with the garbage
+        collector paused. This is the fast path used by the loaders.
+
+        Parameters
+        ----------
+        taxids: list
+            Taxid of each Node
+        parent_taxids: list
+            Taxid of the parent of each Node. The root has no parent:
+            `None`, an empty string or its own taxid.
+        ranks: list
+            Rank of each Node
+        names: list
+            Name of each Node
+        merged: dict or list, optional
+            Merged taxids and the taxid they were merged into, as a
+            dictionnary or (old, new) pairs
+        types: list, optional
+            Class of each Node, e.g. `DummyNode`. Defaults to `Node`.
+
+        Returns
+        -------
+        Taxonomy
+
+        Raises
+        ------
+        ValueError
+            If the columns have different lengths
+        taxidTools.InvalidNodeError
+            If a parent taxid is not in `taxids`
+        taxidTools.TaxonomyError
+            If taxids are duplicated, or if the Nodes do not form a
+            single tree: several roots or cycles
+
+        Examples
+        --------
+        >>> tax = Taxonomy.from_arrays(['1', '2', '3'], [None, '1', '1'],
+        ...                            ['root', 'genus', 'genus'],
+        ...                            ['root', 'Bos', 'Sus'],
+        ...                            merged={'4': '3'})
+        >>> tax['4'].name
+        'Sus'
+        """
+        n = len(taxids)
+        if not len(parent_taxids) == len(ranks) == len(names) == n \
+                or (types is not None and len(types) != n):
+            raise ValueError("All columns must have the same length")
+
+        # Nodes are created without __init__, attributes in the same order
+        data = {}
+        nodes = []
+        new = object.__new__
+        for taxid, rank, name, node_type in zip(taxids, ranks, names,
+                                                repeat(Node) if types is None else types):
+            taxid = str(taxid)
+            node = new(node_type)
+            node._children = set()
+            node._name = name
+            node._rank = rank
+            node._parent = None
+            node._taxid = taxid
+            data[taxid] = node
+            nodes.append(node)
+        if len(data) != n:
+            counts = Counter(node._taxid for node in nodes)
+            duplicated = [taxid for taxid, count in counts.items() if count > 1]
+            raise TaxonomyError(f"Duplicated taxids: {_preview(duplicated)}")
+
+        # Link to parents, bypassing the parent setter
+        roots = []
+        for node, parent in zip(nodes, parent_taxids):
+            if parent is None or parent == '':
+                roots.append(node)
+                continue
+            parent_node = data.get(parent if isinstance(parent, str) else str(parent))
+            if parent_node is None:
+                raise InvalidNodeError(
+                    f"Parent '{parent}' of Node '{node._taxid}' is not in this Taxonomy")
+            if parent_node is node:
+                roots.append(node)
+                continue
+            node._parent = parent_node
+            parent_node._children.add(node)
+        if len(roots) > 1:
+            raise TaxonomyError(f"Several Nodes have no parent: {_preview([r._taxid for r in roots])}")
+
+        # Nodes out of reach of the root are in cycles
+        reached = 0
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            reached += 1
+            stack.extend(node._children)
+        if reached != n:
+            stack = list(roots)
+            seen = set()
+            while stack:
+                node = stack.pop()
+                seen.add(node)
+                stack.extend(node._children)
+            cycle = [node._taxid for node in nodes if node not in seen]
+            raise TaxonomyError(f"Parent links form a cycle involving: {_preview(cycle)}")
+
+        redirects = {}
+        if merged is not None:
+            for old, target in merged.items() if isinstance(merged, Mapping) else merged:
+                old = str(old)
+                if old in data:
+                    raise TaxonomyError(f"Merged taxid '{old}' is also a Node taxid")
+                data[old] = MergedNode(old, target)
+                redirects[old] = data[old]._new_node
+
+        tax = cls()
+        tax.data = data
+        tax._names.update((node._name, node._taxid) for node in nodes)
+        tax._merged = redirects
+        # fails early on circular merges
+        for old in redirects:
+            tax._resolve_merged(old)
+        return tax
+
+    @staticmethod
+    def stats() -> dict[str, dict]:
+        """
+        Get the statistics recorded by the instrumentation layer
+
+        Statistics are only recorded while instrumentation is enabled
+        and are shared by all Taxonomy instances.
+
+        Returns
+        -------
+        dict
+
+        See Also
+        --------
+        taxidTools.instrumentation
+
+        Examples
+        --------
+        >>> from taxidTools import instrumentation
+        >>> instrumentation.enable()
+        >>> tax.getAncestry(9606)
+        >>> Taxonomy.stats()['Taxonomy.getAncestry']
+        {'calls': 1, 'time': 2.1e-05, 'items': 33}
+        """
+        return get_stats()
+
+    @_instrumented('Taxonomy.copy', _n_result)
     def copy(self) -> Taxonomy:
         """
         Create a deepcopy of the current Taxonomy instance.
@@ -154,16 +411,126 @@ class Taxonomy(UserDict):
         -------
         Taxonomy
         """
-        new = deepcopy(self.data)
-        return Taxonomy(new)
+        new = Taxonomy(deepcopy(self.data))
+        new._names.extend(self._names)
+        new._share_fuzzy_index(self)
+        new._accessions = self._accessions
+        return new
+
+    def memory_usage(self, deep: bool = True) -> dict[str, int]:
+        """
+        Report the memory used by the Taxonomy, in bytes
+
+        Parameters
+        ----------
+        deep: bool
+            If False, only the containers held by the Taxonomy (data store,
+            name lookup and derived indexes) are measured. If True (default),
+            the Node objects and their attributes are measured as well.
+            Strings shared between several Nodes are only counted once.
+
+        Returns
+        -------
+        dict
+            Bytes used by each component, and the `total`.
+
+        Examples
+        --------
+        >>> from taxidTools.synthetic import generate_taxonomy
+        >>> tax = generate_taxonomy(100000)
+        >>> tax.memory_usage(deep=False)
+        {'data': 3844864, 'name_index': 3844920, 'redirects': 103856, 'total': 7793640}
+        """
+        getsizeof = sys.getsizeof
+        usage = {'data': getsizeof(self.data)}
+        for name, index in self._indexes().items():
+            usage[name] = getsizeof(index)
+
+        if deep:
+            seen = set()
+
+            def strsize(string):
+                # Strings are often shared (ranks, taxids used as keys)
+                if string is None or id(string) in seen:
+                    return 0
+                seen.add(id(string))
+                return getsizeof(string)
+
+            nodes = children = taxids = names = ranks = merged = 0
+            for key, node in self.data.items():
+                taxids += strsize(key)
+                if isinstance(node, MergedNode):
+                    merged += getsizeof(node) + getsizeof(node.__dict__) \
+                        + strsize(node._taxid) + strsize(node._new_node)
+                    continue
+                nodes += getsizeof(node) + getsizeof(node.__dict__)
+                children += getsizeof(node._children)
+                taxids += strsize(node._taxid)
+                names += strsize(node._name)
+                ranks += strsize(node._rank)
+            for key, value in self._names.items():
+                names += strsize(key)
+                if isinstance(value, tuple):
+                    names += getsizeof(value)
+            for key, value in self._merged.items():
+                taxids += strsize(key) + strsize(value)
+
+            usage.update({'nodes': nodes,
+                          'children': children,
+                          'taxids': taxids,
+                          'names': names,
+                          'ranks': ranks,
+                          'merged': merged})
+
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def freeze(self, copy: bool = True) -> FrozenTaxonomy:
+        """
+        Create a read-only version of the Taxonomy
+
+        Parameters
+        ----------
+        copy: bool, optional
+            Copy the Nodes (default). The copy is built in bulk, as with
+            `Taxonomy.from_arrays`, in time proportional to the size of the
+            Taxonomy. If False, the Nodes and indexes are handed over to the
+            FrozenTaxonomy without copy and the current instance is left empty.
+
+        Returns
+        -------
+        taxidTools.FrozenTaxonomy
+
+        See Also
+        --------
+        taxidTools.FrozenTaxonomy
+        """
+        if not copy:
+            return FrozenTaxonomy._adopt(self)
+        tax = _from_nodes([node for node in self.data.values() if isinstance(node, _BaseNode)],
+                          self._merged)
+        tax._names.extend(self._names)
+        tax._share_fuzzy_index(self)
+        tax._accessions = self._accessions
+        return FrozenTaxonomy._adopt(tax)
 
     @property
     def root(self) -> Node:
         """
         Returns the root Node, assumes a single root shared by all Nodes
+
+        The root is looked up once and reused until the Taxonomy is modified.
         """
-        anynode = next(iter(self.values()))
-        return Lineage(anynode)[-1]
+        return self._cached('root', self._find_root)
+
+    def _find_root(self) -> Node:
+        """Ancestor of the first Node without parent"""
+        for node in self.data.values():
+            if isinstance(node, _BaseNode):
+                while node._parent is not None:
+                    node = node._parent
+                return node
+        raise TaxonomyError("This Taxonomy has no Node")
 
     def addNode(self, node: Node) -> None:
         """
@@ -182,13 +549,49 @@ class Taxonomy(UserDict):
         >>> tax.addNode(Node(1))
         """
         self[node.taxid] = node
-        if node.name:
-            self._namedict[node.name] = node.taxid
 
-    def getTaxid(self, name: Union[int, str], value: Optional[Any] = None) -> str:
+    @_instrumented('Taxonomy.resolve', _n_result)
+    def resolve(self, taxids: Iterable[Union[str, int]],
+                value: Optional[Any] = None) -> list[str]:
+        """
+        Canonicalize a batch of taxids
+
+        Obsolete taxids are replaced by the taxid of the Node they were
+        merged into, valid taxids are returned unchanged.
+
+        Parameters
+        ----------
+        taxids: list
+            list of taxonomic identification numbers
+        value:
+            A value to return for taxids that do not exist
+
+        Returns
+        -------
+        list
+
+        Examples
+        --------
+        >>> root = Node(1, "root", "root")
+        >>> node = Node(2, "node", "rank", root)
+        >>> tax = Taxonomy.from_list([root, node, MergedNode(3, 2)])
+        >>> tax.resolve([1, 3, 4])
+        ['1', '2', None]
+        """
+        return [value if node is None else node.taxid
+                for node in self._iter_nodes(taxids)]
+
+    def getTaxid(self, name: Union[int, str], value: Optional[Any] = None,
+                 name_class: Optional[str] = None, fuzzy: bool = False,
+                 max_distance: int = 2) -> str:
         """
         Get taxid from name
 
+        Names are matched regardless of case and extra whitespaces.
+        If several Nodes share a name, exact matches are preferred, then
+        the first Node added to the Taxonomy.
+        If other name classes were loaded (see `read_taxdump`), Node names
+        are preferred over synonyms, common names, etc.
 
         Parameters
         ----------
@@ -196,6 +599,14 @@ class Taxonomy(UserDict):
             Node name
         value:
             A value to return if name does not exist
+        name_class: str, optional
+            Only match names of this class, e.g. 'scientific name'
+            for the Node names or 'synonym'
+        fuzzy: bool
+            If the name does not exist, return the taxid of the
+            closest name instead, see `Taxonomy.fuzzy_matches`
+        max_distance: int
+            Maximal edit distance of fuzzy matches
 
         Returns
         -------
@@ -207,11 +618,174 @@ class Taxonomy(UserDict):
         >>> tax = Taxonomy({'1':node})
         >>> tax.getTaxid('node')
         '1'
+        >>> tax.getTaxid(' NODE')
+        '1'
+        >>> tax.getTaxid('nose', fuzzy=True)
+        '1'
         """
-        try:
-            return self._namedict[name]
-        except KeyError:
-            return value
+        taxid = self._names.first(str(name), self.data, name_class)
+        if taxid is None and fuzzy:
+            taxid = self._fuzzy_first(str(name), max_distance, name_class)
+        return value if taxid is None else taxid
+
+    @_instrumented('Taxonomy.fuzzy_matches', _n_result)
+    def fuzzy_matches(self, name: str, max_distance: int = 2,
+                      limit: Optional[int] = 10) -> list[tuple[str, str, int]]:
+        """
+        Find the Nodes with names close to a name
+
+        Names of all classes are matched after normalization (see
+        `Taxonomy.getTaxid`), allowing up to `max_distance` insertions,
+        deletions or substitutions of characters.
+        The matching index is built on the first call, it can be
+        saved with `Taxonomy.write_fuzzy_index` to avoid rebuilding it.
+
+        Parameters
+        ----------
+        name: str
+            Name to look up
+        max_distance: int
+            Maximal edit distance
+        limit: int, optional
+            Maximal number of results
+
+        Returns
+        -------
+        list
+            (matched name, taxid, distance) tuples, closest matches first.
+            Matched names are normalized.
+
+        Examples
+        --------
+        >>> tax.fuzzy_matches('Bos tarus')
+        [('bos taurus', '9913', 1)]
+        """
+        result = []
+        for match, distance in self._fuzzy_index().search(name, max_distance):
+            for taxid in self._names.get(match, self.data):
+                result.append((match, taxid, distance))
+                if limit is not None and len(result) >= limit:
+                    return result
+        return result
+
+    def set_accession_index(self, index: Optional[Union[AccessionIndex, str]]) -> None:
+        """
+        Look up sequence accessions in addition to taxids
+
+        Once an accession index is set, accessions can be used in place of
+        taxids to access Nodes with brackets and in batch getters.
+        Keys that are not taxids are searched in the index, merged taxids
+        are resolved.
+
+        Parameters
+        ----------
+        index: taxidTools.AccessionIndex or str
+            An AccessionIndex or the path to an index file,
+            None to remove the index
+
+        See Also
+        --------
+        taxidTools.AccessionIndex
+
+        Examples
+        --------
+        >>> tax.set_accession_index('nucl_gb.idx')
+        >>> tax['NC_000001.11'].name
+        'Homo sapiens'
+        >>> tax.getNames(['NC_000001.11', 'NC_012920'])
+        ['Homo sapiens', 'Homo sapiens']
+        """
+        if isinstance(index, str):
+            index = AccessionIndex(index)
+        self._accessions = index
+
+    def write_fuzzy_index(self, path: str) -> None:
+        """
+        Save the index used for fuzzy name matching
+
+        Parameters
+        ----------
+        path: str
+            File path for the output
+
+        See Also
+        --------
+        Taxonomy.read_fuzzy_index
+        """
+        self._fuzzy_index().save(path)
+
+    def read_fuzzy_index(self, path: str) -> None:
+        """
+        Load an index for fuzzy name matching saved with `Taxonomy.write_fuzzy_index`
+
+        The index should have been saved from the same Taxonomy,
+        names that are not in the Taxonomy are never returned.
+        Like an index built on first use, it is discarded when the
+        Taxonomy is modified.
+
+        Parameters
+        ----------
+        path: str
+            Path of the file to load
+        """
+        self._derived['fuzzy_index'] = FuzzyIndex.load(path)
+
+    def find_taxids(self, name: str, name_class: Optional[str] = None) -> list[str]:
+        """
+        Get the taxids of all Nodes with a name
+
+        Names are matched regardless of case and extra whitespaces,
+        exact matches come first, then matches in other name classes.
+
+        Parameters
+        ----------
+        name: str
+            Node name
+        name_class: str, optional
+            Only match names of this class
+
+        Returns
+        -------
+        list
+
+        See Also
+        --------
+        Taxonomy.getTaxid
+
+        Examples
+        --------
+        >>> tax.find_taxids('Bacillus')
+        ['1386', '55087']
+        """
+        return self._names.get(str(name), self.data, name_class)
+
+    def search_names(self, prefix: str, limit: Optional[int] = None) -> list[tuple[str, str]]:
+        """
+        Find the Nodes whose name starts with a prefix
+
+        The prefix is matched regardless of case and extra whitespaces,
+        a trailing space only matches complete words.
+
+        Parameters
+        ----------
+        prefix: str
+            Beginning of the names
+        limit: int, optional
+            Maximal number of results
+
+        Returns
+        -------
+        list
+            (name, taxid) tuples, in alphabetical order
+
+        Examples
+        --------
+        >>> tax.search_names('bos t')
+        [('Bos taurus', '9913')]
+        >>> tax.search_names('bos ', limit=2)
+        [('Bos gaurus', '9904'), ('Bos indicus', '9915')]
+        """
+        return self._names.prefix(prefix, self.data, limit)
 
     def getName(self, taxid: Union[str, int], value: Optional[Any] = None) -> str:
         """
@@ -323,6 +897,144 @@ class Taxonomy(UserDict):
         except InvalidNodeError:
             return value
 
+    @_instrumented('Taxonomy.getTaxids', _n_result)
+    def getTaxids(self, names: Iterable[str], value: Optional[Any] = None,
+                  name_class: Optional[str] = None, fuzzy: bool = False,
+                  max_distance: int = 2) -> list[str]:
+        """
+        Get taxids from a batch of names
+
+        Parameters
+        ----------
+        names: list
+            list of Node names
+        value:
+            A value to return for names that do not exist
+        name_class: str, optional
+            Only match names of this class
+        fuzzy: bool
+            Return the taxid of the closest name for names
+            that do not exist
+        max_distance: int
+            Maximal edit distance of fuzzy matches
+
+        Returns
+        -------
+        list
+
+        See Also
+        --------
+        Taxonomy.getTaxid
+
+        Examples
+        --------
+        >>> node = Node(1, "node", "rank")
+        >>> tax = Taxonomy({'1':node})
+        >>> tax.getTaxids(['node', 'notanode'])
+        ['1', None]
+        """
+        first = self._names.first
+        data = self.data
+        result = []
+        for name in names:
+            taxid = first(str(name), data, name_class)
+            if taxid is None and fuzzy:
+                taxid = self._fuzzy_first(str(name), max_distance, name_class)
+            result.append(value if taxid is None else taxid)
+        return result
+
+    @_instrumented('Taxonomy.getNames', _n_result)
+    def getNames(self, taxids: Iterable[Union[str, int]], value: Optional[Any] = None) -> list[str]:
+        """
+        Get names from a batch of taxids
+
+        Parameters
+        ----------
+        taxids: list
+            list of taxonomic identification numbers
+        value:
+            A value to return for taxids that do not exist
+
+        Returns
+        -------
+        list
+
+        See Also
+        --------
+        Taxonomy.getName
+
+        Examples
+        --------
+        >>> node = Node(1, "node", "rank")
+        >>> tax = Taxonomy({'1':node})
+        >>> tax.getNames([1, 2])
+        ['node', None]
+        """
+        return [value if node is None else node.name
+                for node in self._iter_nodes(taxids)]
+
+    @_instrumented('Taxonomy.getRanks', _n_result)
+    def getRanks(self, taxids: Iterable[Union[str, int]], value: Optional[Any] = None) -> list[str]:
+        """
+        Get ranks from a batch of taxids
+
+        Parameters
+        ----------
+        taxids: list
+            list of taxonomic identification numbers
+        value:
+            A value to return for taxids that do not exist
+
+        Returns
+        -------
+        list
+
+        See Also
+        --------
+        Taxonomy.getRank
+
+        Examples
+        --------
+        >>> node = Node(1, "node", "rank")
+        >>> tax = Taxonomy({'1':node})
+        >>> tax.getRanks([1, 2])
+        ['rank', None]
+        """
+        return [value if node is None else node.rank
+                for node in self._iter_nodes(taxids)]
+
+    @_instrumented('Taxonomy.getParents', _n_result)
+    def getParents(self, taxids: Iterable[Union[str, int]], value: Optional[Any] = None) -> list[_BaseNode]:
+        """
+        Retrieve parent Nodes from a batch of taxids
+
+        Parameters
+        ----------
+        taxids: list
+            list of taxonomic identification numbers
+        value:
+            A value to return for taxids that do not exist
+
+        Returns
+        -------
+        list
+
+        See Also
+        --------
+        Taxonomy.getParent
+
+        Examples
+        --------
+        >>> root = Node(1, "root", "root")
+        >>> node = Node(2, "node", "rank", root)
+        >>> tax = Taxonomy({'1': root, '2': node})
+        >>> tax.getParents([2, 3])
+        [Node(1), None]
+        """
+        return [value if node is None else node.parent
+                for node in self._iter_nodes(taxids)]
+
+    @_instrumented('Taxonomy.getAncestry', _n_result)
     def getAncestry(self, taxid: Union[str, int]) -> Lineage:
         """
         Retrieve the ancestry of the given taxid
@@ -410,6 +1122,7 @@ class Taxonomy(UserDict):
         """
         return self[str(taxid)].isDescendantOf(self[str(parent)])
 
+    @_instrumented('Taxonomy.consensus', _n_arg(1))
     def consensus(self, taxid_list: list[Union[str, int]],
                   min_consensus: float, ignore_missing: bool = False) -> Node:
         """
@@ -507,6 +1220,7 @@ class Taxonomy(UserDict):
 
         return last
 
+    @_instrumented('Taxonomy.lca', _n_arg(1))
     def lca(self, taxid_list: list[Union[str, int]], ignore_missing: bool = False) -> Node:
         """
         Get lowest common node of a bunch of taxids
@@ -552,6 +1266,7 @@ class Taxonomy(UserDict):
         """
         return self.consensus(taxid_list, 1, ignore_missing=ignore_missing)
 
+    @_instrumented('Taxonomy.distance')
     def distance(self, taxid1: Union[str, int],
                  taxid2: Union[str, int]) -> int:
         """
@@ -559,40 +1274,393 @@ class Taxonomy(UserDict):
 
         Parameters
         ----------
-        taxid1: str or int
-            Taxonomic identification number
-        taxid2: str or int
-            Taxonomic identification number
+        taxid1: str or int
+            Taxonomic identification number
+        taxid2: str or int
+            Taxonomic identification number
+
+        Returns
+        -------
+        int
+
+        Examples
+        --------
+        >>> node0 = Node(taxid = 0, name = "root",
+                         rank = "root", parent = None)
+        >>> node1 = Node(taxid = 1, name = "node1",
+                         rank = "rank1", parent = node0)
+        >>> node2 = Node(taxid = 2, name = "node2",
+                         rank = "rank1", parent = node0)
+        >>> node11 = Node(taxid = 11, name = "node11",
+                          rank = "rank2", parent = node1)
+        >>> node12 = Node(taxid = 12, name = "node12",
+                          rank = "rank2", parent = node1)
+        >>> tax = Taxonomy.from_list([node0, node1, node2, node11, node12])
+        >>> tax.distance(11, 2)
+        3
+        >>> tax.distance(11, 12)
+        2
+        """
+        lca = self.lca([str(taxid1), str(taxid2)]).taxid
+
+        d1 = len(Lineage(self[str(taxid1)])) - 1
+        d2 = len(Lineage(self[str(taxid2)])) - 1
+        dlca = len(Lineage(self[lca])) - 1
+
+        return d1 + d2 - 2 * dlca
+
+    @_instrumented('Taxonomy.match_expected', _n_result)
+    def match_expected(self, observed: Iterable[Union[str, int]],
+                       expected: Iterable[Union[str, int]],
+                       ignore_missing: bool = False) -> list[Optional[tuple[str, int, str]]]:
+        """
+        Match observed taxids to their nearest expected taxid
+
+        For each observed taxid, finds the closest expected taxid
+        in the tree, as measured by `Taxonomy.distance`, and the rank
+        of their last common ancestor.
+
+        All matches are computed at once: each expected taxid marks its
+        ancestors with their distance to it, and observed lineages are
+        walked up only until a lineage already visited.
+
+        Parameters
+        ----------
+        observed: list
+            Observed taxids, e.g. the consensus assignment of each sequence
+        expected: list
+            Expected taxids, e.g. the species of a mock community
+        ignore_missing: bool
+            Return None for observed taxids that are not in the Taxonomy
+            and ignore missing expected taxids, instead of raising an error
+
+        Returns
+        -------
+        list
+            A (expected taxid, distance, rank of the last common ancestor)
+            tuple for each observed taxid. Ties are resolved in favor of
+            the deepest last common ancestor, then of the first expected taxid.
+
+        Raises
+        ------
+        taxidTools.InvalidNodeError
+            If a taxid is not in the Taxonomy and `ignore_missing` is False
+
+        See Also
+        --------
+        Taxonomy.distance
+
+        Examples
+        --------
+        >>> tax.match_expected(['9913', '9903', '9915'], ['9913', '9606'])
+        [('9913', 0, 'species'), ('9913', 1, 'genus'), ('9913', 2, 'genus')]
+        """
+        expected = list(expected)
+        observed = list(observed)
+
+        # Shortest distance from each ancestor of an expected Node
+        # down to an expected Node
+        down = {}
+        for taxid, node in zip(expected, self._iter_nodes(expected)):
+            if node is None:
+                if ignore_missing:
+                    continue
+                raise InvalidNodeError(f"There is no Node with taxid '{taxid}' in this Taxonomy")
+            distance = 0
+            target = node._taxid
+            while node is not None:
+                best = down.get(node)
+                if best is None or distance < best[0]:
+                    down[node] = (distance, target)
+                elif best[0] <= distance:
+                    # Ancestors were already reached with a shorter path
+                    break
+                node = node._parent
+                distance += 1
+
+        # Best match of each visited Node, meeting at the Node itself
+        # or above it. Values are (distance, expected taxid, meeting Node).
+        nomatch = (float('inf'), None, None)
+        memo = {}
+        result = []
+        for taxid, node in zip(observed, self._iter_nodes(observed)):
+            if node is None:
+                if ignore_missing:
+                    result.append(None)
+                    continue
+                raise InvalidNodeError(f"There is no Node with taxid '{taxid}' in this Taxonomy")
+            path = []
+            current = node
+            while current is not None and current not in memo:
+                path.append(current)
+                current = current._parent
+            match = nomatch if current is None else memo[current]
+            for current in reversed(path):
+                distance, target, meet = match
+                match = (distance + 1, target, meet)
+                here = down.get(current)
+                if here is not None and here[0] <= match[0]:
+                    match = (here[0], here[1], current)
+                memo[current] = match
+            distance, target, meet = match
+            result.append(None if target is None else (target, distance, meet._rank))
+        return result
+
+    @_instrumented('Taxonomy.rollup', _n_result)
+    def rollup(self, taxids: Union[Mapping[Union[str, int], int], Iterable[Union[str, int]]],
+               counts: Optional[Iterable[int]] = None,
+               ranks: Optional[list[str]] = None,
+               ignore_missing: bool = False) -> dict[str, tuple[int, int]]:
+        """
+        Aggregate direct and cumulative counts over the taxonomy
+
+        Counts assigned to each taxid are accumulated up the tree
+        in a single pass over the nodes on the path from the assigned
+        taxids to the root. For each of these nodes, the direct count
+        (reads assigned to the node itself) and the clade count
+        (reads assigned to the node and its descendants) are reported.
+
+        Parameters
+        ----------
+        taxids: dict or list
+            Either a mapping of taxids to counts or a list of taxids.
+        counts: list, optional
+            Counts aligned with `taxids` if `taxids` is a list. If
+            omitted, each element of `taxids` counts as one, e.g. one
+            taxid per read.
+        ranks: list, optional
+            Restrict the output to Nodes with these ranks. Direct counts
+            of Nodes with other ranks are attributed to their closest
+            reported ancestor. The root is always reported.
+        ignore_missing: bool
+            if True will ignore missing taxids form the analysis. If False (default),
+            will raise an Error on missing taxids
+
+        Returns
+        -------
+        dict
+            A dictionnary of taxids to (direct, clade) counts, children
+            always come before their parents.
+
+        Raises
+        ------
+        taxidTools.InvalidNodeError
+            If `taxids` contains invalid taxids and `ignore_missing` is `False`
+
+        Examples
+        --------
+        >>> node0 = Node(taxid = 0, name = "root",
+                         rank = "root", parent = None)
+        >>> node1 = Node(taxid = 1, name = "node1",
+                         rank = "rank1", parent = node0)
+        >>> node2 = Node(taxid = 2, name = "node2",
+                         rank = "rank1", parent = node0)
+        >>> node11 = Node(taxid = 11, name = "node11",
+                          rank = "rank2", parent = node1)
+        >>> tax = Taxonomy.from_list([node0, node1, node2, node11])
+        >>> tax.rollup([11, 11, 1, 2])
+        {'2': (1, 1), '11': (2, 2), '1': (1, 3), '0': (0, 4)}
+        >>> tax.rollup({11: 2, 1: 1, 2: 1}, ranks=['rank1'])
+        {'2': (1, 1), '1': (3, 3), '0': (0, 4)}
+        """
+        # Aggregate input per taxid
+        if isinstance(taxids, Mapping):
+            assigned = Counter()
+            for taxid, count in taxids.items():
+                assigned[taxid] += count
+        elif counts is not None:
+            assigned = Counter()
+            for taxid, count in zip(taxids, counts):
+                assigned[taxid] += count
+        else:
+            assigned = Counter(taxids)
+
+        # Resolve taxids to Nodes
+        direct = {}
+        for taxid, node in zip(assigned, self._iter_nodes(assigned)):
+            if node is None:
+                if ignore_missing:
+                    continue
+                raise InvalidNodeError(f"There is no Node with taxid '{taxid}' in this Taxonomy")
+            direct[node] = direct.get(node, 0) + assigned[taxid]
+
+        # Collect the touched subtree, counting touched children of each node
+        pending = {}
+        for node in direct:
+            if node in pending:
+                continue
+            pending[node] = 0
+            parent = node._parent
+            while parent is not None:
+                if parent in pending:
+                    pending[parent] += 1
+                    break
+                pending[parent] = 1
+                parent = parent._parent
+
+        # Post-order accumulation, starting from the touched leaves
+        clade = {node: direct.get(node, 0) for node in pending}
+        if ranks is not None:
+            ranks = set(ranks)
+            # clade counts of the closest reported descendants
+            below = dict.fromkeys(pending, 0)
+        stack = [node for node, n in pending.items() if n == 0]
+        result = {}
+        while stack:
+            node = stack.pop()
+            parent = node._parent
+            if ranks is None:
+                result[node.taxid] = (direct.get(node, 0), clade[node])
+            elif node.rank in ranks or parent is None:
+                result[node.taxid] = (clade[node] - below[node], clade[node])
+                if parent is not None:
+                    below[parent] += clade[node]
+            elif parent is not None:
+                below[parent] += below[node]
+            if parent is not None:
+                clade[parent] += clade[node]
+                pending[parent] -= 1
+                if not pending[parent]:
+                    stack.append(parent)
+
+        return result
+
+    def lineage_table(self, ranks: Optional[list[str]] = linne(),
+                      taxids: Optional[Iterable[Union[str, int]]] = None,
+                      fmt: str = 'names') -> Iterator[tuple]:
+        """
+        Generate a rank-normalized lineage table
+
+        Yields one row per taxid, containing the taxid followed by the
+        name (or taxid) of its ancestor at each of the requested ranks,
+        or `None` if the lineage has no Node at this rank. The values are
+        the same as those of a Lineage filtered with `Lineage.filter(ranks)`.
+
+        The table is filled top-down, each row reusing the row of
+        its parent.
+
+        Parameters
+        ----------
+        ranks: list, optional
+            Ranks to report, defaults to `linne()`
+        taxids: list, optional
+            Taxids to report, in this order. Unknown taxids have a row
+            of `None`. If omitted, all Nodes are reported, parents before
+            their descendants.
+        fmt: str
+            Report the 'names' or the 'taxids' of the ancestors
 
         Returns
         -------
-        int
+        iterator
+
+        See Also
+        --------
+        Taxonomy.write_lineage_table
 
         Examples
         --------
-        >>> node0 = Node(taxid = 0, name = "root",
-                         rank = "root", parent = None)
-        >>> node1 = Node(taxid = 1, name = "node1",
-                         rank = "rank1", parent = node0)
-        >>> node2 = Node(taxid = 2, name = "node2",
-                         rank = "rank1", parent = node0)
-        >>> node11 = Node(taxid = 11, name = "node11",
-                          rank = "rank2", parent = node1)
-        >>> node12 = Node(taxid = 12, name = "node12",
-                          rank = "rank2", parent = node1)
-        >>> tax = Taxonomy.from_list([node0, node1, node2, node11, node12])
-        >>> tax.distance(11, 2)
-        3
-        >>> tax.distance(11, 12)
-        2
+        >>> list(tax.lineage_table(['species', 'genus'], taxids=[9913]))
+        [('9913', 'Bos taurus', 'Bos')]
+
+        Load the table in a pandas DataFrame:
+
+        >>> ranks = linne()
+        >>> df = pandas.DataFrame.from_records(tax.lineage_table(ranks),
+        ...                                    columns=['taxid'] + ranks)
         """
-        lca = self.lca([str(taxid1), str(taxid2)]).taxid
+        if fmt not in ['names', 'taxids']:
+            raise ValueError("Parameter 'fmt' must be either 'names' or 'taxids'")
+        attr = '_name' if fmt == 'names' else '_taxid'
+        ranks = list(ranks)
+        positions = {}
+        for i, rank in enumerate(ranks):
+            positions.setdefault(rank, []).append(i)
+        empty = (None,) * len(ranks)
+
+        def update(row, node):
+            # The highest Node of a rank wins, as in Lineage.filter
+            for i in positions.get(node._rank, ()):
+                if row[i] is None:
+                    row = row[:i] + (getattr(node, attr),) + row[i + 1:]
+            return row
+
+        if taxids is None:
+            stack = [(self.root, empty)] if self.data else []
+            while stack:
+                node, row = stack.pop()
+                row = update(row, node)
+                yield (node._taxid,) + row
+                stack.extend((child, row) for child in node._children)
+            return
+
+        memo = {}
+        taxids = [str(taxid) for taxid in taxids]
+        for taxid, node in zip(taxids, self._iter_nodes(taxids)):
+            if node is None:
+                yield (taxid,) + empty
+                continue
+            path = []
+            current = node
+            while current is not None and current not in memo:
+                path.append(current)
+                current = current._parent
+            row = empty if current is None else memo[current]
+            for current in reversed(path):
+                row = memo[current] = update(row, current)
+            yield (taxid,) + row
+
+    @_instrumented('Taxonomy.write_lineage_table')
+    def write_lineage_table(self, path: str,
+                            ranks: Optional[list[str]] = linne(),
+                            taxids: Optional[Iterable[Union[str, int]]] = None,
+                            fmt: str = 'names') -> None:
+        """
+        Write a rank-normalized lineage table to a file
 
-        d1 = len(Lineage(self[str(taxid1)])) - 1
-        d2 = len(Lineage(self[str(taxid2)])) - 1
-        dlca = len(Lineage(self[lca])) - 1
+        The format is chosen from the file extension: '.csv' for
+        comma-separated values, '.parquet' for Parquet (requires the optional
+        dependency `pyarrow`), tab-separated values otherwise.
+        Rows are written as they are generated, the table is never
+        held in memory.
 
-        return d1 + d2 - 2 * dlca
+        Parameters
+        ----------
+        path: str
+            File path for the output
+        ranks: list, optional
+            Ranks to report, defaults to `linne()`
+        taxids: list, optional
+            Taxids to report, defaults to all Nodes
+        fmt: str
+            Report the 'names' or the 'taxids' of the ancestors
+
+        See Also
+        --------
+        Taxonomy.lineage_table
+        """
+        ranks = list(ranks)
+        header = ['taxid'] + ranks
+        rows = self.lineage_table(ranks, taxids, fmt)
+
+        if path.endswith('.parquet'):
+            pa = _optional_import('pyarrow', 'arrow')
+            pq = _optional_import('pyarrow.parquet', 'arrow')
+            schema = pa.schema([(col, pa.string()) for col in header])
+            with pq.ParquetWriter(path, schema) as writer:
+                while True:
+                    chunk = list(islice(rows, 100000))
+                    if not chunk:
+                        break
+                    columns = [pa.array(col, pa.string()) for col in zip(*chunk)]
+                    writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            return
+
+        with open(path, 'w', newline='', buffering=1024 * 1024) as fi:
+            writer = csv.writer(fi, delimiter=',' if path.endswith('.csv') else '\t',
+                                lineterminator='\n')
+            writer.writerow(header)
+            writer.writerows(rows)
 
     def listDescendant(self, taxid: Union[str, int],
                        ranks: Optional[list] = None) -> list[Node]:
@@ -643,6 +1711,7 @@ class Taxonomy(UserDict):
             return [e for e in all if e.rank in ranks]
         return all
 
+    @_instrumented('Taxonomy.prune')
     def prune(self, taxid: Union[str, int], inplace: Optional[bool] = True) -> None:
         """
         Prune the Taxonomy at the given taxid
@@ -702,7 +1771,7 @@ class Taxonomy(UserDict):
             tax = self.copy()
 
         # Getting upstream nodes
-        nodes = self.getAncestry(taxid)
+        nodes = tax.getAncestry(taxid)
 
         # Unlinking other branches from upstream nodes
         # No need to change parents of the other nodes,
@@ -715,10 +1784,115 @@ class Taxonomy(UserDict):
 
         # Update taxonomy
         tax.data = {node.taxid: node for node in nodes}
+        tax._merged = {}
+        names = NameIndex(tax.data)
+        names.extend(tax._names, tax.data)
+        tax._names = names
 
         if not inplace:
             return tax
 
+    @_instrumented('Taxonomy.subtree', _n_arg(1))
+    def subtree(self, taxids: Iterable[Union[str, int]], keep_descendants: bool = False,
+                inplace: bool = False, ignore_missing: bool = False) -> Optional[Taxonomy]:
+        """
+        Extract the smallest Taxonomy containing a set of taxids
+
+        The Nodes of the taxids and all their ancestors are kept, and
+        optionally their descendants. Each Node is visited once, and
+        only the kept Nodes are copied.
+
+        Parameters
+        ----------
+        taxids: list
+            Taxids to keep
+        keep_descendants: bool
+            Also keep all the descendants of the taxids
+        inplace: bool
+            Remove the other Nodes from the Taxonomy, modifying the
+            Node objects. By default (False), the Taxonomy is left unchanged
+            and a new Taxonomy with copies of the kept Nodes is returned.
+        ignore_missing: bool
+            if True will ignore missing taxids form the analysis. If False (default),
+            will raise an Error on missing taxids
+
+        Returns
+        -------
+        Taxonomy or None
+            The new Taxonomy, or None if `inplace` is True
+
+        Raises
+        ------
+        taxidTools.InvalidNodeError
+            If `taxids` contains invalid taxids and `ignore_missing` is `False`
+
+        Notes
+        -----
+        Merged taxids pointing to kept Nodes, other name classes and the
+        accession index are carried over to the new Taxonomy.
+
+        See Also
+        --------
+        Taxonomy.prune
+
+        Examples
+        --------
+        >>> sample = tax.subtree(['9913', '9606'])
+        >>> sample.root.taxid
+        '1'
+        >>> sample.lca(['9913', '9606']).name
+        'Boreoeutheria'
+        """
+        # Mark the Nodes and their ancestors, stopping at marked ancestors
+        kept = {}
+        seeds = []
+        taxids = [str(taxid) for taxid in taxids]
+        for taxid, node in zip(taxids, self._iter_nodes(taxids)):
+            if node is None:
+                if ignore_missing:
+                    continue
+                raise InvalidNodeError(f"There is no Node with taxid '{taxid}' in this Taxonomy")
+            seeds.append(node)
+            while node is not None and node not in kept:
+                kept[node] = None
+                node = node._parent
+
+        if keep_descendants:
+            expanded = set()
+            stack = list(seeds)
+            while stack:
+                node = stack.pop()
+                if node in expanded:
+                    continue
+                expanded.add(node)
+                kept[node] = None
+                stack.extend(node._children)
+
+        merged = {}
+        for old in self._merged:
+            new = self._resolve_merged(old)
+            if isinstance(self.data.get(new), _BaseNode) and self.data[new] in kept:
+                merged[old] = new
+
+        if inplace:
+            for node in kept:
+                if any(child not in kept for child in node._children):
+                    node._children = {child for child in node._children if child in kept}
+            data = {node._taxid: node for node in kept}
+            data.update((old, MergedNode(old, new)) for old, new in merged.items())
+            self.data = data
+            self._merged = merged
+            names = NameIndex(data)
+            names.extend(self._names, data)
+            self._names = names
+            return None
+
+        tax = _from_nodes(list(kept), merged)
+        tax._names.extend(self._names, tax.data)
+        tax._accessions = self._accessions
+        return tax
+
+    @_instrumented('Taxonomy.filterRanks')
     def filterRanks(self, ranks: Optional[list[str]] = linne(), inplace: Optional[bool] = True) -> None:
         """
         Filter a Taxonomy to keep only the ranks provided as arguments.
@@ -799,6 +1973,7 @@ class Taxonomy(UserDict):
                     # relinking a parent-less node raises TypeError
                     # The root will be kept whatever is asked to keep coherence
                     new_nodes.append(node)
+        tax._touch()
 
         # Second step, expand tree
         # Reccursively add DummyNode to fill gaps
@@ -809,10 +1984,15 @@ class Taxonomy(UserDict):
 
         # Update self
         tax.data = {node.taxid: node for node in new_nodes}
+        tax._merged = {}
+        names = NameIndex(tax.data)
+        names.extend(tax._names, tax.data)
+        tax._names = names
 
         if not inplace:
             return tax
 
+    @_instrumented('Taxonomy.write', _n_self)
     def write(self, path: str) -> None:
         """
         Write taxonomy to a JSON file.
@@ -827,18 +2007,302 @@ class Taxonomy(UserDict):
         taxidTools.read_json
         """
         writer = json.dumps([node._to_dict()
-                             for node in self.values()],
+                             for node in self.data.values()],
                             indent=4)
         with open(path, 'w') as fi:
             fi.write(writer)
 
+    def _indexes(self) -> dict[str, Any]:
+        """
+        Derived indexes held by the Taxonomy, by name
+        """
+        indexes = {'name_index': self._names, 'redirects': self._merged}
+        if 'fuzzy_index' in self._derived:
+            indexes['fuzzy_index'] = self._derived['fuzzy_index']
+        return indexes
+
+    def _fuzzy_index(self) -> FuzzyIndex:
+        """
+        Index for fuzzy name matching, built on first use
+        """
+        return self._cached('fuzzy_index', lambda: FuzzyIndex(self._names.keys()))
+
+    def _share_fuzzy_index(self, other: Taxonomy) -> None:
+        """
+        Reuse the fuzzy name matching index of a Taxonomy with the same names
+        """
+        if 'fuzzy_index' in other._derived:
+            self._derived['fuzzy_index'] = other._derived['fuzzy_index']
+
+    def _fuzzy_first(self, name: str, max_distance: int,
+                     name_class: Optional[str] = None) -> Optional[str]:
+        """
+        Taxid of the closest name, or None
+        """
+        for match, distance in self._fuzzy_index().search(name, max_distance):
+            taxids = self._names.get(match, self.data, name_class)
+            if taxids:
+                return taxids[0]
+        return None
+
+    def _iter_nodes(self, taxids: Iterable[Union[str, int]]) -> Iterator[Optional[_BaseNode]]:
+        """
+        Yield the Node of each taxid, or None for missing taxids
+
+        Fast path for batch getters, merged taxids are resolved
+        without raising and catching errors.
+        """
+        data = self.data
+        redirects = self._cached('redirects', dict)
+        accessions = self._accessions
+        for taxid in taxids:
+            taxid = str(taxid)
+            node = data.get(taxid)
+            if node is None and accessions is not None:
+                taxid = accessions.get(taxid)
+                node = data.get(taxid)
+            if isinstance(node, MergedNode):
+                target = redirects.get(taxid)
+                if target is None:
+                    target = self._resolve_merged(taxid)
+                node = data.get(target)
+            yield node
+
+    def _resolve_merged(self, taxid: str) -> str:
+        """
+        Follow a chain of merged taxids to its final target
+
+        Resolved chains are cached for the current generation, so that
+        every taxid of the chain then points directly to the final target.
+        """
+        redirects = self._cached('redirects', dict)
+        target = redirects.get(taxid)
+        if target is not None:
+            return target
+        data = self.data
+        merged = self._merged
+        target = merged[taxid] if taxid in merged else data[taxid].new_node
+        chain = [taxid]
+        while isinstance(data.get(target), MergedNode):
+            if target in redirects:
+                target = redirects[target]
+                break
+            if target in chain:
+                raise TaxonomyError(f"Circular merge involving taxid '{target}'")
+            chain.append(target)
+            target = merged.get(target, data[target].new_node)
+        for t in chain:
+            redirects[t] = target
+        return target
+
+    @_instrumented('Taxonomy.write_taxdump', _n_self)
+    def write_taxdump(self, nodes: str, rankedlineage: str,
+                      merged: Optional[str] = None) -> None:
+        """
+        Write taxonomy to taxdump files.
+
+        Only the columns read by `read_taxdump` are written, that
+        is taxid, parent taxid and rank for `nodes.dmp`, the
+        names of the Node and of its ancestors at the main ranks
+        for `rankedlineage.dmp` and the merged taxids for `merged.dmp`.
+
+        Parameters
+        ----------
+        nodes: str
+            File path for the nodes.dmp output
+        rankedlineage: str
+            File path for the rankedlineage.dmp output
+        merged: str, optional
+            File path for the merged.dmp output
+
+        See Also
+        --------
+        taxidTools.read_taxdump
+        """
+        columns = ['species', 'genus', 'family', 'order',
+                   'class', 'phylum', 'kingdom', 'superkingdom']
+        root = self.root
+
+        with open(nodes, 'w', buffering=1024 * 1024) as fnodes, \
+             open(rankedlineage, 'w', buffering=1024 * 1024) as flineage:
+            # Top-down traversal, carrying the names of the ranked ancestors
+            stack = [(root, {})]
+            while stack:
+                node, ancestors = stack.pop()
+                parent = node.parent.taxid if node.parent else node.taxid
+                fnodes.write(f"{node.taxid}\t|\t{parent}\t|\t{node.rank}\t|\n")
+                lineage = '\t|\t'.join(ancestors.get(rank, '') for rank in columns)
+                flineage.write(f"{node.taxid}\t|\t{node.name or ''}\t|\t{lineage}\t|\n")
+                if node.children:
+                    if node.rank in columns:
+                        ancestors = {**ancestors, node.rank: node.name}
+                    stack.extend((child, ancestors) for child in node.children)
+
+        if merged:
+            with open(merged, 'w', buffering=1024 * 1024) as fmerged:
+                for taxid, node in self.data.items():
+                    if isinstance(node, MergedNode):
+                        fmerged.write(f"{taxid}\t|\t{node.new_node}\t|\n")
+
+    @_instrumented('Taxonomy.to_arrow', _n_result)
+    def to_arrow(self):
+        """
+        Convert the taxonomy to an Apache Arrow table.
+
+        The table has one row per entry with the columns `taxid`,
+        `parent_taxid`, `name`, `rank`, `type` and `merged_into`.
+        `rank` and `type` are dictionary-encoded.
+
+        Requires the optional dependency `pyarrow`.
+
+        Returns
+        -------
+        pyarrow.Table
+
+        See Also
+        --------
+        Taxonomy.to_parquet
+        taxidTools.from_arrow
+        """
+        pa = _optional_import('pyarrow', 'arrow')
+
+        taxids, parents, names, ranks, types, merged = [], [], [], [], [], []
+        for taxid, node in self.data.items():
+            taxids.append(str(taxid))
+            types.append(node.__class__.__name__)
+            if isinstance(node, MergedNode):
+                parents.append(None)
+                names.append(None)
+                ranks.append(None)
+                merged.append(node.new_node)
+            else:
+                parents.append(node.parent.taxid if node.parent else None)
+                names.append(node.name)
+                ranks.append(node.rank)
+                merged.append(None)
+
+        return pa.table({
+            'taxid': pa.array(taxids, pa.string()),
+            'parent_taxid': pa.array(parents, pa.string()),
+            'name': pa.array(names, pa.string()),
+            'rank': pa.array(ranks, pa.string()).dictionary_encode(),
+            'type': pa.array(types, pa.string()).dictionary_encode(),
+            'merged_into': pa.array(merged, pa.string()),
+        })
+
+    @_instrumented('Taxonomy.to_parquet', _n_self)
+    def to_parquet(self, path: str) -> None:
+        """
+        Write taxonomy to a Parquet file.
+
+        Requires the optional dependency `pyarrow`.
+
+        Parameters
+        ----------
+        path: str
+            File path for the output
+
+        See Also
+        --------
+        Taxonomy.to_arrow
+        taxidTools.read_parquet
+        """
+        pq = _optional_import('pyarrow.parquet', 'arrow')
+        pq.write_table(self.to_arrow(), path)
+
+    @_instrumented('Taxonomy.write_report')
+    def write_report(self, path: str, assignments: Iterable[Union[str, int]],
+                     ignore_missing: bool = False,
+                     unclassified: Iterable[Any] = (0, '0', None, '')) -> None:
+        """
+        Write a Kraken-style report from per-read taxid assignments.
+
+        Each line of the report contains the percentage of reads in the
+        clade, the clade count, the direct count, a rank code, the taxid
+        and the indented name of a Node. Nodes are written depth-first,
+        siblings sorted by decreasing clade count.
+
+        Parameters
+        ----------
+        path: str
+            File path for the output
+        assignments: iterable
+            Taxid of each read. The iterable is consumed once and does
+            not need to fit in memory.
+        ignore_missing: bool
+            if True will ignore missing taxids form the analysis. If False (default),
+            will raise an Error on missing taxids
+        unclassified: iterable, optional
+            Values of `assignments` marking unclassified reads,
+            by default `0`, `None` and empty strings.
+
+        Raises
+        ------
+        taxidTools.InvalidNodeError
+            If `assignments` contains invalid taxids and `ignore_missing` is `False`
+
+        See Also
+        --------
+        Taxonomy.rollup
+        """
+        counts = Counter(assignments)
+        unclassified = sum(counts.pop(key, 0) for key in set(unclassified))
+        rolled = self.rollup(counts, ignore_missing=ignore_missing)
+
+        with open(path, 'w', buffering=1024 * 1024) as fi:
+            fi.writelines(_report_lines(self, rolled, unclassified))
+
+    @_instrumented('Taxonomy.write_newick')
+    def write_newick(self, path: Union[str, TextIO], names: str = 'name',
+                     nhx: bool = False, quote: bool = False) -> None:
+        """
+        Write the taxonomy as a Newick tree
+
+        The tree is generated iteratively and written in chunks, so that
+        neither the depth of the tree nor its size are limited.
+
+        Parameters
+        ----------
+        path: str or file object
+            File path for the output, or an open text file
+        names: str
+            Node attribute to use as node label, choice of 'name' or 'taxid'
+        nhx: bool
+            Annotate each Node with its rank, and its taxid if labels
+            are names, as NHX comments, e.g. `[&&NHX:taxid=9606:rank=species]`
+        quote: bool
+            Quote all labels. Otherwise spaces are replaced by underscores,
+            and only labels containing Newick punctuation or underscores
+            are quoted.
+
+        Raises
+        ------
+        ValueError
+            If `names` is not 'name' or 'taxid'
+
+        See Also
+        --------
+        taxidTools.read_newick
+        """
+        if names not in ['name', 'taxid']:
+            raise ValueError("Parameter 'names' must be either 'name' or 'taxid'")
+
+        chunks = _newick_chunks(self, names, nhx, quote)
+        if isinstance(path, str):
+            with open(path, 'w', buffering=1024 * 1024) as fi:
+                fi.writelines(chunks)
+        else:
+            path.writelines(chunks)
+
+    @_instrumented('Taxonomy.toNewick')
     def toNewick(self, names: str = 'name') -> str:
         """
-        Generate a Newock string fro the current taxonomy
+        Generate a Newick string from the current taxonomy
 
         Export as Newick tree string for compatibility with other packages
         Import in ETE with format 8 (all names).
-        Experimental feature
+        For large taxonomies, prefer writing directly to a file with
+        `Taxonomy.write_newick`.
 
         Parameters
         ----------
@@ -848,23 +2312,331 @@ class Taxonomy(UserDict):
         Returns
         -------
         str
+
+        See Also
+        --------
+        Taxonomy.write_newick
         """
+        buffer = io.StringIO()
+        self.write_newick(buffer, names)
+        return buffer.getvalue()
 
-        def subtree(node, names):
-            if names == 'name':
-                namestring = str(node.name.replace(" ", "_"))
-            elif names == 'taxid':
-                namestring = str(node.taxid)
 
-            if not node.children:
-                return namestring
-            subtrees = [subtree(child) for child in node.children]
-            return f"({','.join(subtrees)}){namestring}"
+_versions = count(1)
+
+
+class FrozenTaxonomy(Taxonomy):
+    """
+    Read-only Taxonomy
+
+    A FrozenTaxonomy supports all queries of a Taxonomy, but methods
+    modifying it in place raise a `FrozenTaxonomyError`. Methods that can
+    return a modified copy, such as `prune` or `filterRanks` with
+    `inplace=False`, return a regular, mutable, Taxonomy.
+
+    FrozenTaxonomy objects are hashable and carry a unique `version`
+    that can be used as key for caches and derived data.
+    The root and the resolved merged taxids are computed on creation.
+    The fuzzy name matching index is still built on first use, under a
+    lock, so that a FrozenTaxonomy can be shared between threads.
+
+    Notes
+    -----
+    Nodes themselves remain mutable objects and must not be modified
+    after freezing.
+
+    See Also
+    --------
+    Taxonomy.freeze
+
+    Examples
+    --------
+    >>> frozen = tax.freeze()
+    >>> frozen.lca(['9606', '10090']).name
+    'Euarchontoglires'
+    >>> frozen.prune('9606')
+    FrozenTaxonomyError: A FrozenTaxonomy cannot be modified
+    >>> pruned = frozen.prune('9606', inplace=False)  # a mutable Taxonomy
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        self._frozen = False
+        self._lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+        self._version = next(_versions)
+        self._hash = None
+        self._frozen = True
+        self._build_caches()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if getattr(self, '_frozen', False) and name == 'data':
+            raise FrozenTaxonomyError()
+        super().__setattr__(name, value)
+
+    def __setitem__(self, key: str, node: Union[_BaseNode, MergedNode]) -> None:
+        if self._frozen:
+            raise FrozenTaxonomyError()
+        super().__setitem__(key, node)
+
+    def __delitem__(self, key: str) -> None:
+        raise FrozenTaxonomyError()
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self.items()))
+        return self._hash
+
+    def __repr__(self):
+        return f"FrozenTaxonomy({set(self.values())})"
+
+    @property
+    def version(self) -> int:
+        """Unique identifier of this FrozenTaxonomy"""
+        return self._version
+
+    @classmethod
+    def from_arrays(cls, *args, **kwargs) -> FrozenTaxonomy:
+        """
+        Create a FrozenTaxonomy from columns of Node attributes,
+        see `Taxonomy.from_arrays`
+        """
+        return Taxonomy.from_arrays(*args, **kwargs).freeze(copy=False)
+
+    @classmethod
+    def _adopt(cls, tax: Taxonomy) -> FrozenTaxonomy:
+        """
+        FrozenTaxonomy taking over the Nodes and indexes of a Taxonomy,
+        which is left empty
+        """
+        frozen = cls()
+        frozen._frozen = False
+        frozen.data = tax.data
+        frozen._merged = tax._merged
+        frozen._names = tax._names
+        frozen._share_fuzzy_index(tax)
+        frozen._accessions = tax._accessions
+        frozen._frozen = True
+        frozen._build_caches()
+        tax.data = {}
+        tax._merged = {}
+        tax._names = NameIndex()
+        return frozen
+
+    def _build_caches(self) -> None:
+        """
+        Compute the derived data used by queries, except the fuzzy index
+        """
+        if any(isinstance(node, _BaseNode) for node in self.data.values()):
+            self.root
+        for taxid in self._merged:
+            self._resolve_merged(taxid)
+
+    def _cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Derived data, computed once under a lock
+        """
+        derived = self._derived
+        if key not in derived:
+            with self._lock:
+                if key not in derived:
+                    derived[key] = compute()
+        return derived[key]
+
+    def set_accession_index(self, index: Optional[Union[AccessionIndex, str]]) -> None:
+        """
+        Raises
+        ------
+        taxidTools.FrozenTaxonomyError
+            Accession indexes must be set before freezing
+        """
+        raise FrozenTaxonomyError()
+
+    def read_fuzzy_index(self, path: str) -> None:
+        """
+        Raises
+        ------
+        taxidTools.FrozenTaxonomyError
+            Fuzzy indexes must be loaded before freezing
+        """
+        raise FrozenTaxonomyError()
+
+    def freeze(self, copy: bool = False) -> FrozenTaxonomy:
+        """Return self, a FrozenTaxonomy is already read-only"""
+        return self
+
+    def prune(self, taxid: Union[str, int], inplace: Optional[bool] = True) -> Optional[Taxonomy]:
+        """
+        Return a pruned copy of the Taxonomy, see `Taxonomy.prune`
+
+        Raises
+        ------
+        taxidTools.FrozenTaxonomyError
+            If `inplace` is True
+        """
+        if inplace:
+            raise FrozenTaxonomyError()
+        return super().prune(taxid, inplace=False)
+
+    def subtree(self, taxids: Iterable[Union[str, int]], keep_descendants: bool = False,
+                inplace: bool = False, ignore_missing: bool = False) -> Optional[Taxonomy]:
+        """
+        Return the smallest Taxonomy containing a set of taxids, see `Taxonomy.subtree`
+
+        Raises
+        ------
+        taxidTools.FrozenTaxonomyError
+            If `inplace` is True
+        """
+        if inplace:
+            raise FrozenTaxonomyError()
+        return super().subtree(taxids, keep_descendants, inplace=False,
+                               ignore_missing=ignore_missing)
+
+    def filterRanks(self, ranks: Optional[list[str]] = linne(),
+                    inplace: Optional[bool] = True) -> Optional[Taxonomy]:
+        """
+        Return a filtered copy of the Taxonomy, see `Taxonomy.filterRanks`
+
+        Raises
+        ------
+        taxidTools.FrozenTaxonomyError
+            If `inplace` is True
+        """
+        if inplace:
+            raise FrozenTaxonomyError()
+        return super().filterRanks(ranks, inplace=False)
+
+
+_RANK_CODES = {
+    'superkingdom': 'D',
+    'domain': 'D',
+    'kingdom': 'K',
+    'phylum': 'P',
+    'class': 'C',
+    'order': 'O',
+    'family': 'F',
+    'genus': 'G',
+    'species': 'S',
+}
+
+
+def _report_lines(tax: Taxonomy, rolled: dict[str, tuple[int, int]],
+                  unclassified: int) -> Iterator[str]:
+    """
+    Generate the lines of a Kraken-style report from rolled-up counts
+    """
+    # Children of each reported node
+    children = {}
+    root = None
+    for taxid in rolled:
+        node = tax[taxid]
+        if node.parent is None:
+            root = node
+        else:
+            children.setdefault(node.parent.taxid, []).append(node)
+
+    total = unclassified + (rolled[root.taxid][1] if root else 0)
+
+    def line(clade, direct, code, taxid, name):
+        return f"{100 * clade / total:6.2f}\t{clade}\t{direct}\t{code}\t{taxid}\t{name}\n"
+
+    if unclassified:
+        yield line(unclassified, unclassified, 'U', 0, 'unclassified')
+    if root is None:
+        return
+
+    # Depth-first, code of the last ranked ancestor is propagated
+    # to unranked descendants with an increasing suffix
+    stack = [(root, 0, 'R', 0)]
+    while stack:
+        node, depth, code, offset = stack.pop()
+        if node.parent is None:
+            code, offset = 'R', 0
+        elif node.rank in _RANK_CODES:
+            code, offset = _RANK_CODES[node.rank], 0
+        else:
+            offset += 1
+        direct, clade = rolled[node.taxid]
+        yield line(clade, direct, f"{code}{offset or ''}", node.taxid,
+                   f"{'  ' * depth}{node.name}")
+        kids = sorted(children.get(node.taxid, []),
+                      key=lambda n: rolled[n.taxid][1])
+        stack.extend((child, depth + 1, code, offset) for child in kids)
+
+
+def _from_nodes(nodes: list[_BaseNode], merged: Mapping[str, str]) -> Taxonomy:
+    """
+    Taxonomy of new Nodes with the same attributes and links as `nodes`
+    """
+    return Taxonomy.from_arrays([node._taxid for node in nodes],
+                                [node._parent._taxid if node._parent is not None else None
+                                 for node in nodes],
+                                [node._rank for node in nodes],
+                                [node._name for node in nodes],
+                                merged,
+                                [type(node) for node in nodes])
+
+
+def _preview(taxids: list[str], n: int = 5) -> str:
+    """Quoted list of the first taxids of a list, for error messages"""
+    text = ', '.join(f"'{taxid}'" for taxid in taxids[:n])
+    return text + (f" and {len(taxids) - n} more" if len(taxids) > n else '')
 
-        if names not in ['name', 'taxid']:
-            raise ValueError("Parameter 'names' must be either 'name' or 'taxid'")
 
-        return f"{subtree(self.root, names)};"
+# Characters that can only appear in quoted Newick labels
+_NEWICK_PUNCTUATION = re.compile(r"[\s()\[\]',:;_]")
+
+
+def _newick_label(label: Optional[str], quote: bool) -> str:
+    """Format a Newick label"""
+    if label is None:
+        return ''
+    if quote or _NEWICK_PUNCTUATION.search(label.replace(' ', '')):
+        return "'" + label.replace("'", "''") + "'"
+    return label.replace(' ', '_')
+
+
+def _newick_chunks(tax: Taxonomy, names: str, nhx: bool, quote: bool,
+                   chunk_size: int = 65536) -> Iterator[str]:
+    """
+    Generate a Newick tree in chunks of at least `chunk_size` tokens
+
+    A stack of pending Nodes and tokens replaces recursion, each Node
+    pushes its closing label first, then its children separated by commas.
+    """
+    attr = '_name' if names == 'name' else '_taxid'
+
+    def label(node):
+        text = _newick_label(getattr(node, attr), quote)
+        if nhx:
+            tags = [f"taxid={node._taxid}"] if names == 'name' else []
+            if node._rank is not None:
+                tags.append(f"rank={node._rank}")
+            text += f"[&&NHX:{':'.join(tags)}]"
+        return text
+
+    buffer = []
+    append = buffer.append
+    stack = [tax.root] if tax.data else []
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            append(item)
+        elif item._children:
+            append('(')
+            stack.append(label(item))
+            stack.append(')')
+            for i, child in enumerate(item._children):
+                if i:
+                    stack.append(',')
+                stack.append(child)
+        else:
+            append(label(item))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer.clear()
+    append(';')
+    yield ''.join(buffer)
 
 
 def _flatten(t: list) -> list:
@@ -1,19 +1,28 @@
 from .Node import Node, DummyNode, MergedNode
-from .Taxonomy import Taxonomy
+from .Taxonomy import Taxonomy, FrozenTaxonomy
 from .Lineage import Lineage
-from .factories import read_json, read_taxdump
+from .CladeFilter import CladeFilter
+from .AccessionIndex import AccessionIndex
+from .Evaluation import Evaluation
+from .factories import read_json, read_taxdump, read_parquet, from_arrow, read_newick
 from .utils import linne
-from .exceptions import TaxonomyError, InvalidNodeError
+from .exceptions import TaxonomyError, InvalidNodeError, FrozenTaxonomyError
+from . import instrumentation
 from .__version__ import __version__, __title__, __description__
 from .__version__ import __author__, __author_email__, __licence__
 from .__version__ import __url__
 
 __all__ = ['Node', 'DummyNode', 'MergedNode',
-           'Taxonomy',
+           'Taxonomy', 'FrozenTaxonomy',
            'Lineage',
-           'read_json', 'read_taxdump',
+           'CladeFilter',
+           'AccessionIndex',
+           'Evaluation',
+           'read_json', 'read_taxdump', 'read_parquet', 'from_arrow',
+           'read_newick',
            'linne',
-           'TaxonomyError', 'InvalidNodeError',
+           'TaxonomyError', 'InvalidNodeError', 'FrozenTaxonomyError',
+           'instrumentation',
            '__version__',
            '__title__',
            '__description__',
@@ -0,0 +1,255 @@
+"""
+Command line interface
+
+Batch queries on a Taxonomy, reading taxids, names or groups of taxids
+line by line from files or stdin and streaming tab-separated results
+to stdout.
+
+Examples
+--------
+$ taxidtools --taxdump taxdump/ --cache taxonomy.json lineage --ranks species,genus < taxids.txt
+$ cut -f2 blast.tsv | taxidtools -t taxonomy.json name2taxid
+$ taxidtools -t taxonomy.json serve --socket /tmp/taxidtools.sock
+"""
+
+
+from __future__ import annotations
+import argparse
+import os
+import sys
+from itertools import islice
+from typing import Iterable, Iterator, Optional, TextIO
+from .Taxonomy import Taxonomy
+from .Node import DummyNode
+from .factories import read_json, read_taxdump, read_parquet
+from .exceptions import InvalidNodeError
+from .server import run_server
+from .__version__ import __version__
+
+
+def load_taxonomy(path: Optional[str] = None,
+                  taxdump: Optional[str] = None,
+                  cache: Optional[str] = None) -> Taxonomy:
+    """
+    Load a Taxonomy from an exported file or a taxdump folder
+
+    Parameters
+    ----------
+    path: str, optional
+        Path to a JSON or Parquet file, as written by `Taxonomy.write`
+        or `Taxonomy.to_parquet`
+    taxdump: str, optional
+        Folder containing the nodes.dmp, rankedlineage.dmp and
+        optionally merged.dmp files
+    cache: str, optional
+        JSON or Parquet file used as a cache for `taxdump`. The cache is
+        created on first use and reused as long as it is more recent than
+        the taxdump files.
+
+    Returns
+    -------
+    taxidTools.Taxonomy
+    """
+    if path:
+        return _read(path)
+    if not taxdump:
+        raise ValueError("Either a Taxonomy file or a taxdump folder must be provided")
+
+    files = [os.path.join(taxdump, f) for f in ['nodes.dmp', 'rankedlineage.dmp', 'merged.dmp']]
+    if not os.path.exists(files[2]):
+        files = files[:2]
+
+    if cache and os.path.exists(cache) and \
+            os.path.getmtime(cache) >= max(os.path.getmtime(f) for f in files):
+        return _read(cache)
+
+    tax = read_taxdump(*files)
+    if cache:
+        _write(tax, cache)
+    return tax
+
+
+def _read(path: str) -> Taxonomy:
+    if path.endswith('.parquet'):
+        return read_parquet(path)
+    return read_json(path)
+
+
+def _write(tax: Taxonomy, path: str) -> None:
+    if path.endswith('.parquet'):
+        tax.to_parquet(path)
+    else:
+        tax.write(path)
+
+
+def _batches(lines: Iterable[str], size: int) -> Iterator[list[str]]:
+    """Group stripped, non-empty input lines in batches"""
+    lines = (line.strip() for line in lines)
+    lines = (line for line in lines if line)
+    while True:
+        batch = list(islice(lines, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _group(line: str) -> list[str]:
+    """Taxids of a line, separated by commas and/or whitespaces"""
+    return line.replace(',', ' ').split()
+
+
+def _lineage(tax: Taxonomy, args: argparse.Namespace, batch: list[str]) -> Iterator[str]:
+    attr = 'name' if args.format == 'names' else 'taxid'
+    for taxid in batch:
+        try:
+            lineage = tax.getAncestry(taxid)
+        except InvalidNodeError:
+            fields = [''] * len(args.ranks) if args.ranks else ['']
+        else:
+            if args.ranks:
+                lineage.filter(args.ranks)
+                fields = ['' if isinstance(node, DummyNode) else getattr(node, attr) or ''
+                          for node in lineage]
+            else:
+                fields = [';'.join(getattr(node, attr) or '' for node in reversed(lineage))]
+        yield '\t'.join([taxid] + fields)
+
+
+def _consensus(tax: Taxonomy, args: argparse.Namespace, batch: list[str]) -> Iterator[str]:
+    min_consensus = getattr(args, 'min_consensus', 1)
+    for line in batch:
+        try:
+            node = tax.consensus(_group(line), min_consensus,
+                                 ignore_missing=args.ignore_missing)
+        except (InvalidNodeError, ValueError):
+            node = None
+        if node is None:
+            yield f"{line}\t\t\t"
+        else:
+            yield f"{line}\t{node.taxid}\t{node.name or ''}\t{node.rank or ''}"
+
+
+def _name2taxid(tax: Taxonomy, args: argparse.Namespace, batch: list[str]) -> Iterator[str]:
+    for name, taxid in zip(batch, tax.getTaxids(batch, value='')):
+        yield f"{name}\t{taxid}"
+
+
+def _rank_at(tax: Taxonomy, args: argparse.Namespace, batch: list[str]) -> Iterator[str]:
+    for taxid in batch:
+        try:
+            lineage = tax.getAncestry(taxid)
+        except InvalidNodeError:
+            yield f"{taxid}\t\t"
+            continue
+        node = next((node for node in lineage if node.rank == args.rank), None)
+        if node is None:
+            yield f"{taxid}\t\t"
+        else:
+            yield f"{taxid}\t{node.taxid}\t{node.name or ''}"
+
+
+def _descendants(tax: Taxonomy, args: argparse.Namespace, batch: list[str]) -> Iterator[str]:
+    for taxid in batch:
+        try:
+            descendants = tax.listDescendant(taxid, ranks=args.ranks)
+        except InvalidNodeError:
+            continue
+        for node in descendants:
+            yield f"{taxid}\t{node.taxid}\t{node.name or ''}\t{node.rank or ''}"
+
+
+def _ranks(value: str) -> list[str]:
+    return [rank.strip() for rank in value.split(',') if rank.strip()]
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='taxidtools',
+        description="Batch taxonomy queries, reading from files or stdin "
+                    "and writing tab-separated results to stdout.")
+    parser.add_argument('--version', action='version', version=f"%(prog)s {__version__}")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('-t', '--taxonomy', help="Taxonomy file in JSON or Parquet format")
+    source.add_argument('--taxdump', help="Folder containing the taxdump files")
+    parser.add_argument('--cache', help="JSON or Parquet file caching the taxdump Taxonomy")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('input', nargs='*', default=['-'],
+                        help="Input files, one query per line (default: stdin)")
+    common.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+    common.add_argument('--batch-size', type=int, default=10000,
+                        help="Number of lines processed at once")
+
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('lineage', parents=[common],
+                       help="Lineage of each taxid, from the root down")
+    p.add_argument('--ranks', type=_ranks,
+                   help="Comma-separated ranks to report in columns instead of the full lineage")
+    p.add_argument('--format', choices=['names', 'taxids'], default='names',
+                   help="Report names or taxids")
+    p.set_defaults(func=_lineage)
+
+    p = sub.add_parser('lca', parents=[common],
+                       help="Last common ancestor of each line of taxids")
+    p.add_argument('--ignore-missing', action='store_true', help="Ignore unknown taxids")
+    p.set_defaults(func=_consensus)
+
+    p = sub.add_parser('consensus', parents=[common],
+                       help="Consensus of each line of taxids")
+    p.add_argument('-m', '--min-consensus', type=float, default=0.51,
+                   help="Minimal consensus level, above 0.5 (default: 0.51)")
+    p.add_argument('--ignore-missing', action='store_true', help="Ignore unknown taxids")
+    p.set_defaults(func=_consensus)
+
+    p = sub.add_parser('name2taxid', parents=[common], help="Taxid of each name")
+    p.set_defaults(func=_name2taxid)
+
+    p = sub.add_parser('rank-at', parents=[common],
+                       help="Ancestor of each taxid at a given rank")
+    p.add_argument('-r', '--rank', required=True, help="Rank of the ancestor")
+    p.set_defaults(func=_rank_at)
+
+    p = sub.add_parser('descendants', parents=[common], help="Descendants of each taxid")
+    p.add_argument('--ranks', type=_ranks, help="Comma-separated ranks to report")
+    p.set_defaults(func=_descendants)
+
+    p = sub.add_parser('serve', help="Serve queries on a Unix socket or a localhost port")
+    p.add_argument('--socket', help="Path of the Unix domain socket")
+    p.add_argument('--host', default='127.0.0.1', help="Interface of the TCP server (default: 127.0.0.1)")
+    p.add_argument('--port', type=int, default=8765, help="Port of the TCP server (default: 8765)")
+    p.set_defaults(func=None)
+
+    return parser
+
+
+def _lines(paths: list[str], stdin: TextIO) -> Iterator[str]:
+    for path in paths:
+        if path == '-':
+            yield from stdin
+        else:
+            with open(path, 'r') as fi:
+                yield from fi
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Entry point of the `taxidtools` command
+    """
+    args = _parser().parse_args(argv)
+    tax = load_taxonomy(args.taxonomy, args.taxdump, args.cache)
+
+    if args.command == 'serve':
+        run_server(tax.freeze(copy=False), args.socket, args.host, args.port)
+        return 0
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', buffering=1024 * 1024)
+    try:
+        for batch in _batches(_lines(args.input, sys.stdin), args.batch_size):
+            results = list(args.func(tax, args, batch))
+            if results:
+                out.write('\n'.join(results) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
@@ -13,3 +13,8 @@ class TaxonomyError(Exception):
 
 class InvalidNodeError(TaxonomyError, KeyError):
     """Raised when a Node doesn't exist"""
+
+
+class FrozenTaxonomyError(TaxonomyError, TypeError):
+    """Raised when trying to modify a FrozenTaxonomy"""
+    default_message = 'A FrozenTaxonomy cannot be modified'
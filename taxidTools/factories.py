@@ -3,12 +3,18 @@ Factory functions for instanciating `taxidTools.Taxonomy` objects
 """
 
 import json
+import re
 from typing import Iterator, Optional
 from .Taxonomy import Taxonomy
 from .Node import Node, DummyNode, _BaseNode, MergedNode
+from .utils import _optional_import
+from .instrumentation import _instrumented, _n_result
 
 
-def read_taxdump(nodes: str, rankedlineage: str, merged: Optional[str] = None) -> Taxonomy:
+@_instrumented('read_taxdump', _n_result)
+def read_taxdump(nodes: str, rankedlineage: str, merged: Optional[str] = None,
+                 names: Optional[str] = None,
+                 name_classes: Optional[list[str]] = None) -> Taxonomy:
     """
     Read a Taxonomy from the NCBI`s taxdump files
 
@@ -20,6 +26,12 @@ def read_taxdump(nodes: str, rankedlineage: str, merged: Optional[str] = None) -
         Path to the rankedlineage.dmp file
     merged: str, optional
         Path tothe merged.mp file
+    names: str, optional
+        Path to the names.dmp file. Synonyms, common names and other
+        name classes are then also found by `Taxonomy.getTaxid`.
+    name_classes: list, optional
+        Name classes to load from names.dmp, e.g. ['synonym',
+        'genbank common name']. Defaults to all classes.
 
     Returns
     -------
@@ -29,38 +41,46 @@ def read_taxdump(nodes: str, rankedlineage: str, merged: Optional[str] = None) -
     --------
     >>> tax = read_taxdump("nodes.dmp', 'rankedlineage.dmp')
 
+    With synonyms and common names:
+
+    >>> tax = read_taxdump("nodes.dmp', 'rankedlineage.dmp', names='names.dmp')
+    >>> tax.getTaxid('cattle')
+    '9913'
+
     See Also
     --------
     read_json
     """
-    txd = {}
-    parent_dict = {}
-
-    # Creating nodes
+    taxids, parents, ranks = [], [], []
     for line in _parse_dump(nodes):
-        txd[line[0]] = Node(taxid=line[0], rank=str(line[2]))
-        parent_dict[str(line[0])] = line[1]  # storing parent id
+        taxids.append(line[0])
+        parents.append(line[1])
+        ranks.append(line[2])
 
-    # Add names from rankedlineage
-    for line in _parse_dump(rankedlineage):
-        txd[line[0]].name = line[1]
+    # Names from rankedlineage
+    node_names = {line[0]: line[1] for line in _parse_dump(rankedlineage)}
 
-    # Update parent info
-    for k, v in parent_dict.items():
-        txd[k].parent = txd[v]
+    merged_pairs = [(line[0], line[1]) for line in _parse_dump(merged)] if merged else None
 
-    # parsing merged
-    if merged:
-        for line in _parse_dump(merged):
-            txd[line[0]] = MergedNode(line[0],line[1])
+    tax = Taxonomy.from_arrays(taxids, parents, ranks,
+                               [node_names.get(taxid) for taxid in taxids],
+                               merged_pairs)
 
-    return Taxonomy(txd)
+    if names:
+        _read_names(tax, names, name_classes)
 
+    return tax
 
+
+@_instrumented('read_json', _n_result)
 def read_json(path: str) -> Taxonomy:
     """
     Load a Taxonomy from a previously exported json file.
 
+    Files written by earlier versions, which repeated the record of a
+    Node for each taxid merged into it, are accepted: repeated records
+    are skipped and the merged taxids are lost.
+
     Parameters
     ----------
     path: str
@@ -79,27 +99,288 @@ def read_json(path: str) -> Taxonomy:
     with open(path, 'r') as fi:
         parser = json.loads(fi.read())
 
-    txd = {}
-    parent_dict = {}
+    classes = {'Node': Node, 'DummyNode': DummyNode}
+    taxids, parents, names, ranks, types, merged = [], [], [], [], [], []
+    records = {}
 
-    # Create nodes from records
+    # Class attributes are hidden and therefore start with "_"
     for record in parser:
-        class_call = eval(record.pop('type'))
-        if '_parent' in record:
-            parent_dict[record['_taxid']] = record.pop('_parent')
-
-        # Class attributes are hidden and therefore start with "_"
-        # Init takes same named arguments with the "_"
-        txd[record['_taxid']] = class_call(
-            **{k[1:]: v for k, v in record.items()}
-        )
-
-    # Update parent info
-    for k, v in parent_dict.items():
-        if v:
-            txd[k].parent = txd[v]
-
-    return Taxonomy(txd)
+        node_type = record['type']
+        if node_type == 'MergedNode':
+            merged.append((record['_taxid'], record['_new_node']))
+            continue
+        if node_type not in classes:
+            raise ValueError(f"Unknown Node type '{node_type}' in '{path}'")
+        if records.get(record['_taxid']) == record:
+            # Repeated record of a merged taxid, written by versions < 3.2.0
+            continue
+        records[record['_taxid']] = record
+        taxids.append(record['_taxid'])
+        parents.append(record.get('_parent'))
+        names.append(record.get('_name'))
+        ranks.append(record.get('_rank'))
+        types.append(classes[node_type])
+
+    return Taxonomy.from_arrays(taxids, parents, ranks, names, merged, types)
+
+
+@_instrumented('from_arrow', _n_result)
+def from_arrow(table) -> Taxonomy:
+    """
+    Load a Taxonomy from an Apache Arrow table.
+
+    Requires the optional dependency `pyarrow`.
+
+    Parameters
+    ----------
+    table: pyarrow.Table
+        Table with the columns `taxid`, `parent_taxid`, `name`, `rank`,
+        `type` and `merged_into`
+
+    Returns
+    -------
+    taxidTools.Taxonomy
+
+    See Also
+    --------
+    taxidTools.Taxonomy.to_arrow
+    read_parquet
+    """
+    pa = _optional_import('pyarrow', 'arrow')
+    pc = _optional_import('pyarrow.compute', 'arrow')
+
+    # Rows are split with Arrow, columns are then converted as a whole
+    is_merged = pc.equal(table.column('type').cast(pa.string()), 'MergedNode')
+    nodes = table.filter(pc.invert(is_merged))
+    merged = table.filter(is_merged)
+
+    classes = {'Node': Node, 'DummyNode': DummyNode}
+    types = _arrow_to_list(nodes.column('type'))
+    return Taxonomy.from_arrays(_arrow_to_list(nodes.column('taxid')),
+                                _arrow_to_list(nodes.column('parent_taxid')),
+                                _arrow_to_list(nodes.column('rank')),
+                                _arrow_to_list(nodes.column('name')),
+                                zip(_arrow_to_list(merged.column('taxid')),
+                                    _arrow_to_list(merged.column('merged_into'))),
+                                list(map(classes.__getitem__, types)))
+
+
+def _arrow_to_list(column) -> list:
+    """
+    Python values of an Arrow column
+
+    Dictionary-encoded chunks are decoded from their dictionary, so that
+    each distinct value is converted once and shared by its rows.
+    """
+    values = []
+    for chunk in column.chunks:
+        if not hasattr(chunk, 'dictionary'):
+            values.extend(chunk.to_pylist())
+            continue
+        dictionary = chunk.dictionary.to_pylist()
+        indices = chunk.indices.to_pylist()
+        if chunk.null_count:
+            values.extend(None if i is None else dictionary[i] for i in indices)
+        else:
+            values.extend(map(dictionary.__getitem__, indices))
+    return values
+
+
+@_instrumented('read_parquet', _n_result)
+def read_parquet(path: str) -> Taxonomy:
+    """
+    Load a Taxonomy from a previously exported Parquet file.
+
+    Requires the optional dependency `pyarrow`.
+
+    Parameters
+    ----------
+    path: str
+        Path of file to load
+
+    Returns
+    -------
+    taxidTools.Taxonomy
+
+    See Also
+    --------
+    taxidTools.Taxonomy.to_parquet
+    read_json
+    """
+    pq = _optional_import('pyarrow.parquet', 'arrow')
+    return from_arrow(pq.read_table(path))
+
+
+@_instrumented('read_newick', _n_result)
+def read_newick(path: str, names: str = 'name') -> Taxonomy:
+    """
+    Load a Taxonomy from a Newick tree
+
+    The file is read in chunks and parsed without recursion, so that
+    neither the depth of the tree nor its size are limited. Only the
+    first tree of the file is read, branch lengths are ignored.
+
+    Taxids and ranks are read from NHX comments, as written by
+    `Taxonomy.write_newick` with `nhx=True`. Nodes without a taxid
+    annotation use their label as taxid, and Nodes without a rank
+    annotation have the rank 'no rank'.
+
+    Parameters
+    ----------
+    path: str
+        Path of file to load
+    names: str
+        Content of the node labels, choice of 'name' or 'taxid'
+
+    Returns
+    -------
+    taxidTools.Taxonomy
+
+    Raises
+    ------
+    ValueError
+        If the file is not a valid Newick tree, or if a Node has no taxid
+    taxidTools.TaxonomyError
+        If a taxid is duplicated
+
+    See Also
+    --------
+    taxidTools.Taxonomy.write_newick
+
+    Examples
+    --------
+    >>> tax.write_newick('tree.nwk', nhx=True)
+    >>> tax = read_newick('tree.nwk')
+    """
+    if names not in ['name', 'taxid']:
+        raise ValueError("Parameter 'names' must be either 'name' or 'taxid'")
+
+    parents, labels, tags = _parse_newick(path)
+
+    taxids, ranks = [], []
+    for label, tag in zip(labels, tags):
+        tag = tag or {}
+        taxid = tag.get('taxid', label) if names == 'name' else label
+        if taxid is None:
+            raise ValueError(f"A Node has no label or taxid in '{path}'")
+        taxids.append(taxid)
+        ranks.append(tag.get('rank', 'no rank'))
+
+    return Taxonomy.from_arrays(
+        taxids, [None if parent is None else taxids[parent] for parent in parents], ranks,
+        labels if names == 'name' else [None] * len(labels))
+
+
+def _parse_newick(path: str) -> tuple[list, list, list]:
+    """
+    Parse the first tree of a Newick file
+
+    Returns the parent index, label and NHX tags of each Node,
+    in order of appearance so that parents come before their children.
+    """
+    parents = []
+    labels = []
+    tags = []
+    opened = []
+    current = None
+
+    for tokens in _newick_tokens(path):
+        for quoted, comment, punctuation, _, label, invalid in tokens:
+            if punctuation:
+                if punctuation == ';':
+                    break
+                if punctuation == '(':
+                    parents.append(opened[-1] if opened else None)
+                    labels.append(None)
+                    tags.append(None)
+                    opened.append(len(parents) - 1)
+                    current = None
+                    continue
+                if current is None:
+                    # Unlabelled leaf
+                    parents.append(opened[-1] if opened else None)
+                    labels.append(None)
+                    tags.append(None)
+                if punctuation == ',':
+                    current = None
+                elif not opened:
+                    raise ValueError(f"Unbalanced parentheses in '{path}'")
+                else:
+                    current = opened.pop()
+                continue
+
+            if invalid:
+                raise ValueError(f"Invalid Newick character '{invalid}' in '{path}'")
+            if current is None:
+                parents.append(opened[-1] if opened else None)
+                labels.append(None)
+                tags.append(None)
+                current = len(parents) - 1
+            if label:
+                labels[current] = label.replace('_', ' ')
+            elif quoted:
+                labels[current] = quoted[1:-1].replace("''", "'")
+            elif comment.startswith('[&&NHX'):
+                tags[current] = dict(tag.split('=', 1) for tag in comment[7:-1].split(':') if '=' in tag)
+        else:
+            continue
+        break
+
+    if opened:
+        raise ValueError(f"Unbalanced parentheses in '{path}'")
+    return parents, labels, tags
+
+
+# Groups: quoted label, comment, punctuation, branch length, label, invalid
+_NEWICK_TOKEN = re.compile(r"\s*(?:('(?:[^']|'')*'(?!'))|(\[[^\]]*\])|([(),;])"
+                           r"|:([^(),;:\[\]\s]*)|([^(),;:\[\]'\s]+)|(.))", re.DOTALL)
+
+
+def _newick_tokens(path: str, chunk_size: int = 1024 * 1024) -> Iterator[list[tuple]]:
+    """
+    Newick token iterator, yields lists of token groups for each chunk
+
+    Chunks are cut after their last parenthesis or comma. If the cut
+    falls in a quoted label or a comment, the chunk is extended, up to
+    a few times its size before the invalid token is reported.
+    """
+    findall = _NEWICK_TOKEN.findall
+    with open(path, 'r') as fi:
+        text = ''
+        while True:
+            chunk = fi.read(chunk_size)
+            text += chunk
+            if not chunk:
+                yield findall(text)
+                return
+            cut = max(text.rfind(','), text.rfind('('), text.rfind(')')) + 1
+            if not cut:
+                continue
+            tokens = findall(text, 0, cut)
+            if any(token[5] for token in tokens) and len(text) < 4 * chunk_size:
+                continue
+            yield tokens
+            text = text[cut:]
+
+
+def _read_names(tax: Taxonomy, path: str, name_classes: Optional[list[str]] = None) -> None:
+    """
+    Add the names of a names.dmp file to the name index of a Taxonomy
+    """
+    classes = set(name_classes) if name_classes else None
+    data = tax.data
+    add_name = tax._names.add_name
+    with open(path, 'r') as dmp:
+        for line in dmp:
+            taxid, name, _, name_class = line.split('\t|\t', 3)
+            name_class = name_class.rstrip('\t|\r\n')
+            # Scientific names are already the Node names
+            if name_class == 'scientific name' or (classes and name_class not in classes):
+                continue
+            node = data.get(taxid)
+            if isinstance(node, _BaseNode):
+                # Share the taxid string with the Node
+                add_name(name, node._taxid, name_class)
 
 
 def _parse_dump(filepath: str) -> Iterator:
@@ -0,0 +1,211 @@
+"""
+Opt-in instrumentation of the main taxidTools functions
+
+When enabled, each call to an instrumented function records its
+wall time and, where it makes sense, the number of items it processed.
+Statistics are collected process-wide and can be forwarded to sinks,
+for example a logger.
+
+Instrumentation is disabled by default and then only costs a flag check
+per call.
+
+Examples
+--------
+>>> from taxidTools import instrumentation
+>>> with instrumentation.profile() as stats:
+...     tax = read_taxdump('nodes.dmp', 'rankedlineage.dmp')
+...     tax.lca(['9606', '10090'])
+>>> stats['Taxonomy.consensus']
+{'calls': 1, 'time': 0.0001, 'items': 2}
+"""
+
+
+from __future__ import annotations
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable, Iterator, Optional
+
+
+_enabled = False
+_stats = {}
+_sinks = []
+_lock = threading.Lock()
+
+
+def enable() -> None:
+    """Start recording statistics"""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording statistics, recorded statistics are kept"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Is instrumentation currently enabled?"""
+    return _enabled
+
+
+def reset() -> None:
+    """Discard all recorded statistics"""
+    with _lock:
+        _stats.clear()
+
+
+def get_stats() -> dict[str, dict]:
+    """
+    Get a snapshot of the recorded statistics
+
+    Returns
+    -------
+    dict
+        Statistics for each instrumented function name, with the keys
+        `calls` (number of calls), `time` (cumulative wall time in seconds)
+        and `items` (cumulative number of processed items, or `None`)
+    """
+    with _lock:
+        return {name: dict(record) for name, record in _stats.items()}
+
+
+def add_sink(sink: Callable[[str, float, Optional[int]], None]) -> None:
+    """
+    Register a function called after each instrumented call
+
+    Parameters
+    ----------
+    sink: callable
+        Called with the function name, the elapsed time in seconds
+        and the number of processed items (or `None`)
+    """
+    _sinks.append(sink)
+
+
+def remove_sink(sink: Callable[[str, float, Optional[int]], None]) -> None:
+    """Unregister a sink"""
+    _sinks.remove(sink)
+
+
+def logging_sink(logger: Optional[logging.Logger] = None,
+                 level: int = logging.DEBUG) -> Callable[[str, float, Optional[int]], None]:
+    """
+    Create a sink writing each call to a logger
+
+    Parameters
+    ----------
+    logger: logging.Logger, optional
+        Logger to use, defaults to the 'taxidTools' logger
+    level: int
+        Logging level of the messages
+
+    Returns
+    -------
+    callable
+
+    Examples
+    --------
+    >>> instrumentation.add_sink(instrumentation.logging_sink())
+    """
+    logger = logger or logging.getLogger('taxidTools')
+
+    def sink(name, elapsed, items):
+        logger.log(level, "%s: %.6fs, %s items", name, elapsed, items)
+    return sink
+
+
+@contextmanager
+def profile() -> Iterator[dict[str, dict]]:
+    """
+    Record statistics for the duration of a `with` block
+
+    Yields a dictionnary that is filled with the statistics of the
+    calls made inside the block when the block exits.
+    The previous enabled state is restored on exit.
+    """
+    global _enabled
+    previous = _enabled
+    before = get_stats()
+    stats = {}
+    _enabled = True
+    try:
+        yield stats
+    finally:
+        _enabled = previous
+        for name, record in get_stats().items():
+            old = before.get(name, {'calls': 0, 'time': 0., 'items': None})
+            calls = record['calls'] - old['calls']
+            if not calls:
+                continue
+            items = record['items']
+            if items is not None and old['items'] is not None:
+                items -= old['items']
+            stats[name] = {'calls': calls,
+                           'time': record['time'] - old['time'],
+                           'items': items}
+
+
+def _record(name: str, elapsed: float, items: Optional[int]) -> None:
+    with _lock:
+        record = _stats.get(name)
+        if record is None:
+            record = _stats[name] = {'calls': 0, 'time': 0., 'items': None}
+        record['calls'] += 1
+        record['time'] += elapsed
+        if items is not None:
+            record['items'] = (record['items'] or 0) + items
+    for sink in _sinks:
+        sink(name, elapsed, items)
+
+
+def _instrumented(name: str, items: Optional[Callable] = None) -> Callable:
+    """
+    Decorator recording calls to the decorated function
+
+    Parameters
+    ----------
+    name: str
+        Name under which statistics are recorded
+    items: callable, optional
+        Called with the result, positional and keyword arguments of the
+        call to get the number of processed items
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            result = func(*args, **kwargs)
+            elapsed = perf_counter() - start
+            _record(name, elapsed, items(result, args, kwargs) if items else None)
+            return result
+        return wrapper
+    return decorator
+
+
+def _n_result(result, args, kwargs) -> Optional[int]:
+    """Number of items in the result"""
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def _n_arg(position: int) -> Callable:
+    """Number of items in a positional argument"""
+    def count(result, args, kwargs):
+        try:
+            return len(args[position])
+        except (IndexError, TypeError):
+            return None
+    return count
+
+
+def _n_self(result, args, kwargs) -> Optional[int]:
+    """Number of items in the instance, for methods returning None"""
+    return len(args[0])
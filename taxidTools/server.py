@@ -0,0 +1,310 @@
+"""
+Taxonomy query server and client
+
+Keeps a Taxonomy resident in memory and answers batched queries over a
+Unix domain socket or a localhost TCP port, so that short-lived processes
+do not need to load the taxonomy themselves.
+
+The protocol is line-based: each request is a JSON object on a single line,
+with the name of the operation in `op` and its arguments, and is answered
+by a JSON object on a single line with either a `result` or an `error`.
+
+Examples
+--------
+Start the server from the command line:
+
+$ taxidtools -t taxonomy.parquet serve --socket /tmp/taxidtools.sock
+
+And query it from Python:
+
+>>> from taxidTools.server import TaxonomyClient
+>>> with TaxonomyClient('/tmp/taxidtools.sock') as client:
+...     client.names(['9606', '10090'])
+...     client.lca([['9606', '10090']])
+['Homo sapiens', 'Mus musculus']
+['314146']
+"""
+
+
+from __future__ import annotations
+import asyncio
+import json
+import socket
+from typing import Any, Optional, Union
+from .Taxonomy import Taxonomy
+from .Node import DummyNode
+from .exceptions import InvalidNodeError, TaxonomyError
+
+
+def _lineage(tax: Taxonomy, taxids: list, ranks: Optional[list[str]] = None) -> list:
+    result = []
+    for taxid in taxids:
+        try:
+            lineage = tax.getAncestry(taxid)
+        except InvalidNodeError:
+            result.append(None)
+            continue
+        if ranks:
+            lineage.filter(ranks)
+            result.append([None if isinstance(node, DummyNode) else node.taxid
+                           for node in lineage])
+        else:
+            result.append([node.taxid for node in lineage])
+    return result
+
+
+def _consensus(tax: Taxonomy, groups: list, min_consensus: float = 0.51,
+               ignore_missing: bool = False) -> list:
+    result = []
+    for group in groups:
+        try:
+            node = tax.consensus(group, min_consensus, ignore_missing=ignore_missing)
+        except (InvalidNodeError, ValueError):
+            node = None
+        result.append(node.taxid if node else None)
+    return result
+
+
+def _lca(tax: Taxonomy, groups: list, ignore_missing: bool = False) -> list:
+    return _consensus(tax, groups, 1, ignore_missing)
+
+
+_OPERATIONS = {
+    'lineage': _lineage,
+    'lca': _lca,
+    'consensus': _consensus,
+    'names': lambda tax, taxids: tax.getNames(taxids),
+    'ranks': lambda tax, taxids: tax.getRanks(taxids),
+    'taxids': lambda tax, names: tax.getTaxids(names),
+    'resolve': lambda tax, taxids: tax.resolve(taxids),
+}
+
+
+def _answer(tax: Taxonomy, line: bytes) -> dict:
+    try:
+        request = json.loads(line)
+        op = request.pop('op')
+        func = _OPERATIONS[op]
+    except (ValueError, KeyError, AttributeError, TypeError):
+        return {'error': f"Invalid request, operations are {sorted(_OPERATIONS)}"}
+    try:
+        return {'result': func(tax, **request)}
+    except (TypeError, ValueError, TaxonomyError) as err:
+        return {'error': f"{op}: {err}"}
+
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    """
+    Read a line from a stream, an empty string at the end of the stream
+
+    Lines longer than the limit of the stream are skipped to their end
+    before raising ValueError, so that the next line can be read.
+    """
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as err:
+        # End of the stream, possibly after a last line without newline
+        return err.partial
+    except asyncio.LimitOverrunError as err:
+        consumed = err.consumed
+    try:
+        while True:
+            await reader.readexactly(consumed)
+            try:
+                await reader.readuntil(b'\n')
+                break
+            except asyncio.LimitOverrunError as err:
+                consumed = err.consumed
+    except asyncio.IncompleteReadError:
+        pass
+    raise ValueError("Request line exceeds the size limit")
+
+
+async def start_server(taxonomy: Taxonomy, path: Optional[str] = None,
+                       host: str = '127.0.0.1', port: int = 8765,
+                       limit: int = 2 ** 30) -> asyncio.AbstractServer:
+    """
+    Start serving queries on a Taxonomy
+
+    Requests are answered in a thread pool, so that large batches do not
+    block other connections. Errors are answered per request and do not
+    close the connection.
+
+    Parameters
+    ----------
+    taxonomy: taxidTools.Taxonomy
+        The Taxonomy to query. A mutable Taxonomy is copied to a
+        `FrozenTaxonomy` first, pass a FrozenTaxonomy to avoid the copy.
+    path: str, optional
+        Path of a Unix domain socket. If omitted, a TCP server is
+        started on `host` and `port` instead.
+    host: str
+        Interface of the TCP server, defaults to localhost
+    port: int
+        Port of the TCP server
+    limit: int
+        Maximum size of a request line in bytes, defaults to 1 GiB
+
+    Returns
+    -------
+    asyncio.AbstractServer
+
+    See Also
+    --------
+    run_server
+    """
+    # Threads only read a FrozenTaxonomy, its caches are built on creation
+    taxonomy = taxonomy.freeze()
+
+    async def handle(reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await _readline(reader)
+                except ValueError:
+                    answer = {'error': f"Request exceeds the limit of {limit} bytes"}
+                else:
+                    if not line:
+                        break
+                    try:
+                        answer = await loop.run_in_executor(None, _answer, taxonomy, line)
+                    except Exception as err:
+                        answer = {'error': f"Internal error: {err!r}"}
+                writer.write(json.dumps(answer).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    if path:
+        return await asyncio.start_unix_server(handle, path=path, limit=limit)
+    return await asyncio.start_server(handle, host=host, port=port, limit=limit)
+
+
+def run_server(taxonomy: Taxonomy, path: Optional[str] = None,
+               host: str = '127.0.0.1', port: int = 8765) -> None:
+    """
+    Serve queries on a Taxonomy until interrupted
+
+    See `start_server` for the parameters.
+    """
+    async def main():
+        server = await start_server(taxonomy, path, host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class TaxonomyClient:
+    """
+    Client for a Taxonomy query server
+
+    The connection is opened once and reused for all queries.
+
+    Parameters
+    ----------
+    path: str, optional
+        Path of the server's Unix domain socket. If omitted, connects to
+        the TCP server on `host` and `port` instead.
+    host: str
+        Host of the TCP server
+    port: int
+        Port of the TCP server
+
+    Raises
+    ------
+    taxidTools.TaxonomyError
+        If the server answers with an error
+
+    Examples
+    --------
+    >>> client = TaxonomyClient(port=8765)
+    >>> client.lineage(['9913'], ranks=['species', 'genus'])
+    [['9913', '9903']]
+    >>> client.close()
+    """
+    def __init__(self, path: Optional[str] = None,
+                 host: str = '127.0.0.1', port: int = 8765) -> None:
+        if path:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.connect(path)
+        else:
+            self._socket = socket.create_connection((host, port))
+        self._file = self._socket.makefile('rwb')
+
+    def __enter__(self) -> TaxonomyClient:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection"""
+        self._file.close()
+        self._socket.close()
+
+    def query(self, op: str, **kwargs) -> Any:
+        """
+        Send a request to the server and return its result
+
+        Parameters
+        ----------
+        op: str
+            Name of the operation
+        **kwargs:
+            Arguments of the operation
+        """
+        self._file.write(json.dumps({'op': op, **kwargs}).encode() + b'\n')
+        self._file.flush()
+        answer = json.loads(self._file.readline())
+        if 'error' in answer:
+            raise TaxonomyError(answer['error'])
+        return answer['result']
+
+    def lineage(self, taxids: list[Union[str, int]],
+                ranks: Optional[list[str]] = None) -> list[Optional[list[str]]]:
+        """
+        Ancestry of each taxid, as lists of taxids
+
+        If `ranks` are given, lineages are filtered to these ranks with
+        `None` for missing ranks. Unknown taxids return `None`.
+        """
+        return self.query('lineage', taxids=[str(t) for t in taxids], ranks=ranks)
+
+    def lca(self, groups: list[list[Union[str, int]]],
+            ignore_missing: bool = False) -> list[Optional[str]]:
+        """Last common ancestor taxid of each group of taxids"""
+        return self.query('lca', groups=[[str(t) for t in g] for g in groups],
+                          ignore_missing=ignore_missing)
+
+    def consensus(self, groups: list[list[Union[str, int]]], min_consensus: float = 0.51,
+                  ignore_missing: bool = False) -> list[Optional[str]]:
+        """Consensus taxid of each group of taxids"""
+        return self.query('consensus', groups=[[str(t) for t in g] for g in groups],
+                          min_consensus=min_consensus, ignore_missing=ignore_missing)
+
+    def names(self, taxids: list[Union[str, int]]) -> list[Optional[str]]:
+        """Name of each taxid"""
+        return self.query('names', taxids=[str(t) for t in taxids])
+
+    def ranks(self, taxids: list[Union[str, int]]) -> list[Optional[str]]:
+        """Rank of each taxid"""
+        return self.query('ranks', taxids=[str(t) for t in taxids])
+
+    def taxids(self, names: list[str]) -> list[Optional[str]]:
+        """Taxid of each name"""
+        return self.query('taxids', names=names)
+
+    def resolve(self, taxids: list[Union[str, int]]) -> list[Optional[str]]:
+        """Current taxid of each taxid, merged taxids are replaced"""
+        return self.query('resolve', taxids=[str(t) for t in taxids])
@@ -0,0 +1,187 @@
+"""
+Synthetic taxonomy generator
+
+Creates deterministic, NCBI-like taxonomies of arbitrary size
+for testing and benchmarking purposes.
+"""
+
+
+from __future__ import annotations
+import random
+from typing import Optional
+from .Taxonomy import Taxonomy
+from .Node import Node, MergedNode
+
+
+NCBI_RANKS = ['superkingdom',
+              'kingdom',
+              'phylum',
+              'class',
+              'order',
+              'family',
+              'genus',
+              'species']
+
+_SYLLABLES = ['ba', 'ca', 'de', 'di', 'fo', 'ga', 'li', 'lo', 'ma', 'mu',
+              'na', 'ne', 'po', 'ra', 'ri', 'sa', 'ta', 'te', 'to', 'vi',
+              'xa', 'ze', 'cho', 'phy', 'rho', 'the', 'tri', 'bra', 'glo',
+              'spi']
+
+_SUFFIXES = {'superkingdom': 'ota',
+             'kingdom': 'ae',
+             'phylum': 'phyta',
+             'class': 'ia',
+             'order': 'ales',
+             'family': 'aceae',
+             'genus': 'us',
+             'species': 'is'}
+
+
+def generate_taxonomy(n_nodes: int,
+                      seed: Optional[int] = 0,
+                      ranks: Optional[list[str]] = None,
+                      branching: float = 8.,
+                      no_rank: float = .1,
+                      max_depth: int = 40,
+                      merged: float = .05) -> Taxonomy:
+    """
+    Generate a random, NCBI-like Taxonomy
+
+    Nodes are distributed over the ranks so that each level is about
+    `branching` times larger than the level above. Parents are drawn
+    with a preferential attachment process, resulting in a skewed
+    distribution of children numbers. 'no rank' Nodes are then inserted
+    above random Nodes, possibly grouping several siblings.
+
+    Parameters
+    ----------
+    n_nodes: int
+        Number of Nodes in the Taxonomy, including the root
+    seed: int, optional
+        Random seed, the same seed always generates the same Taxonomy
+    ranks: list, optional
+        Ranks to use, sorted by descending ranks. Defaults to the
+        main NCBI ranks from superkingdom to species.
+    branching: float
+        Average size ratio between two consecutive ranks
+    no_rank: float
+        Fraction of Nodes with 'no rank'
+    max_depth: int
+        Maximal depth of a Node, 'no rank' Nodes will not be inserted
+        in lineages that already reached this depth
+    merged: float
+        Number of merged taxids, as a fraction of `n_nodes` (at most 1)
+
+    Returns
+    -------
+    taxidTools.Taxonomy
+
+    Examples
+    --------
+    >>> tax = generate_taxonomy(1000, seed=42)
+    >>> len(tax)  # Nodes and merged taxids
+    1050
+    """
+    ranks = list(ranks or NCBI_RANKS)
+    if n_nodes < len(ranks) + 1:
+        raise ValueError(f"n_nodes must be at least {len(ranks) + 1}")
+    if max_depth <= len(ranks):
+        raise ValueError(f"max_depth must be larger than {len(ranks)}")
+
+    rng = random.Random(seed)
+
+    # Node attributes are stored by index, 0 is the root
+    parents = [None]
+    node_ranks = ['no rank']
+    children = [[]]
+    depth = [0]
+
+    def add(parent, rank):
+        parents.append(parent)
+        node_ranks.append(rank)
+        children.append([])
+        depth.append(depth[parent] + 1)
+        children[parent].append(len(parents) - 1)
+        return len(parents) - 1
+
+    # Number of Nodes per rank, from the bottom up
+    n_unranked = int((n_nodes - 1) * no_rank)
+    remaining = n_nodes - 1 - n_unranked
+    sizes = []
+    for level in range(len(ranks) - 1, 0, -1):
+        size = round(remaining * (1 - 1 / branching))
+        size = max(1, min(size, remaining - level))
+        sizes.insert(0, size)
+        remaining -= size
+    sizes.insert(0, remaining)
+
+    # Top-down, preferential attachment to the previous level
+    level = [0]
+    uniform = rng.random
+    for rank, size in zip(ranks, sizes):
+        urn = list(level)
+        new_level = []
+        for i in range(size):
+            parent = urn[int(uniform() * len(urn))]
+            urn.append(parent)
+            new_level.append(add(parent, rank))
+        level = new_level
+
+    # Insert 'no rank' Nodes between random Nodes and their parents
+    inserted = 0
+    while inserted < n_unranked:
+        node = rng.randrange(1, len(parents))
+        if depth[node] >= max_depth:
+            continue
+        parent = parents[node]
+        siblings = [c for c in children[parent] if c != node]
+        moved = [node] + rng.sample(siblings, rng.randint(0, min(3, len(siblings))))
+        new = add(parent, 'no rank')
+        for child in moved:
+            children[parent].remove(child)
+            children[new].append(child)
+            parents[child] = new
+        # Update depth of the moved subtrees
+        stack = list(moved)
+        while stack:
+            current = stack.pop()
+            depth[current] += 1
+            stack.extend(children[current])
+        inserted += 1
+
+    # Taxids are unique but not ordered, the root is always 1
+    taxids = ['1'] + [str(t) for t in rng.sample(range(2, 3 * n_nodes), n_nodes - 1)]
+
+    # Create Node objects top-down
+    nodes = [Node(taxids[0], 'root', 'no rank')]
+    nodes.extend([None] * (len(parents) - 1))
+    stack = list(children[0])
+    while stack:
+        i = stack.pop()
+        nodes[i] = Node(taxids[i], _name(rng, node_ranks[i], nodes[parents[i]]),
+                        node_ranks[i], nodes[parents[i]])
+        stack.extend(children[i])
+
+    tax = Taxonomy.from_list(nodes)
+
+    # Merged taxids pointing to live Nodes
+    obsolete = rng.sample(range(3 * n_nodes, 4 * n_nodes), int(n_nodes * merged))
+    for old in obsolete:
+        tax.addNode(MergedNode(old, taxids[rng.randrange(1, n_nodes)]))
+
+    return tax
+
+
+def _name(rng: random.Random, rank: str, parent: Node) -> str:
+    """
+    Generate a pseudo-latin name for a Node
+    """
+    word = ''.join(rng.choices(_SYLLABLES, k=2 + int(rng.random() * 3)))
+    if rank == 'species':
+        genus = parent
+        while genus.parent and genus.rank != 'genus':
+            genus = genus.parent
+        return f"{genus.name.split(' ')[0]} {word}{_SUFFIXES[rank]}"
+    if rank == 'no rank':
+        return f"{word.capitalize()} group"
+    return f"{word.capitalize()}{_SUFFIXES.get(rank, '')}"
@@ -3,6 +3,9 @@ Misc. utility functions
 """
 
 
+import functools
+import gc
+import importlib
 import warnings
 import random
 import string
@@ -45,3 +48,33 @@ def _deprecation(depr, replace):
         f"'{depr}' is pending deprecation, use the '{replace}' instead",
         DeprecationWarning, stacklevel=2
     )
+
+
+def _optional_import(module: str, extra: str):
+    """Import an optional dependency or fail with an installation hint"""
+    try:
+        return importlib.import_module(module)
+    except ImportError:
+        raise ImportError(
+            f"'{module}' is required for this feature, "
+            f"install it with 'pip install taxidTools[{extra}]'"
+        ) from None
+
+
+def _gc_paused(func):
+    """
+    Pause the cyclic garbage collector during a call
+
+    Allocating many container objects triggers collections that scan
+    the whole heap without freeing anything.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if enabled:
+                gc.enable()
+    return wrapper
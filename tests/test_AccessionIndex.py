@@ -0,0 +1,74 @@
+import gzip
+import os
+import unittest
+from tempfile import TemporaryDirectory
+import taxidTools
+
+
+current_path = os.path.dirname(__file__)
+nodes = os.path.join(current_path, "data", "mininodes.dmp")
+rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
+merged = os.path.join(current_path, "data", "minimerged.dmp")
+
+
+class TestAccessionIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = TemporaryDirectory()
+        self.gb = os.path.join(self.workdir.name, "nucl_gb.accession2taxid.gz")
+        with gzip.open(self.gb, "wt") as fo:
+            fo.write("accession\taccession.version\ttaxid\tgi\n")
+            fo.write("MN908947\tMN908947.3\t2697049\t1798174254\n")
+            fo.write("AB000001\tAB000001.1\t9913\t1\n")
+            fo.write("NC_012920\tNC_012920.1\t9606\t251831106\n")
+            fo.write("X00001\tX00001.2\t9903\t2\n")
+            fo.write("OLD1\tOLD1.1\t12345\t3\n")
+        self.custom = os.path.join(self.workdir.name, "custom.tsv")
+        with open(self.custom, "w") as fo:
+            fo.write("AB000001.2\t9606\n")
+            fo.write("LONG_ACCESSION_0001.1\t9915\n")
+            fo.write("ZZ1\t9913\n")
+        self.path = os.path.join(self.workdir.name, "accessions.idx")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_build(self):
+        index = taxidTools.AccessionIndex.build([self.gb, self.custom], self.path, chunk_size=2)
+        self.assertEqual(len(index), 7)
+        self.assertEqual(index.get("AB000001.1"), "9913")  # First occurence is kept
+        self.assertEqual(index.get("AB000001"), "9913")
+        self.assertEqual(index.get("LONG_ACCESSION_0001"), "9915")
+        self.assertEqual(index.get("ZZ1.5"), "9913")
+        self.assertIsNone(index.get("AB000002"))
+        self.assertIsNone(index.get("A"))
+        self.assertEqual(index.get("ZZZZ", value="NA"), "NA")
+        self.assertIn("MN908947.3", index)
+        self.assertNotIn("MN90894", index)
+        index.close()
+
+        class SmallBlocks(taxidTools.AccessionIndex):
+            block_size = 2
+
+        index = SmallBlocks(self.path)
+        self.assertEqual(index.get_many(["X00001.2", "OLD1", "nope", "NC_012920.1", "AB000001"]),
+                         ["9903", "12345", None, "9606", "9913"])
+
+        with self.assertRaises(ValueError):
+            taxidTools.AccessionIndex(self.custom)
+
+    def test_taxonomy(self):
+        tax = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        tax.addNode(taxidTools.MergedNode(12345, 9915))
+        tax.set_accession_index(taxidTools.AccessionIndex.build(self.gb, self.path))
+        self.assertEqual(tax["AB000001.1"].taxid, "9913")
+        self.assertEqual(tax["OLD1"].taxid, "9915")
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            tax["MN908947"]
+        self.assertEqual(tax.getNames(["X00001", "9913", "unknown"]), ["Bos", "Bos taurus", None])
+        self.assertEqual(tax.resolve(["OLD1.1"]), ["9915"])
+        self.assertEqual(tax.copy()["X00001"].taxid, "9903")
+
+        tax.set_accession_index(None)
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            tax["X00001"]
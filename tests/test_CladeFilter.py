@@ -0,0 +1,76 @@
+import os
+import unittest
+import taxidTools
+
+
+current_path = os.path.dirname(__file__)
+nodes = os.path.join(current_path, "data", "mininodes.dmp")
+rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
+merged = os.path.join(current_path, "data", "minimerged.dmp")
+
+
+class TestCladeFilter(unittest.TestCase):
+    # Test Tree
+    #
+    # 0
+    # |- 1
+    # |  |- 11
+    # |  |- 12
+    # |      |- 121
+    # |      |- 122
+    # |- 2
+    #    |- 21
+
+    def setUp(self):
+        node0 = taxidTools.Node(taxid = 0, name = "root", rank = "root", parent = None)
+        node1 = taxidTools.Node(taxid = 1, name = "node1", rank = "rank1", parent = node0)
+        node2 = taxidTools.Node(taxid = 2, name = "node2", rank = "rank1", parent = node0)
+        node11 = taxidTools.Node(taxid = 11, name = "node11", rank = "rank2", parent = node1)
+        node12 = taxidTools.Node(taxid = 12, name = "node12", rank = "rank2", parent = node1)
+        node21 = taxidTools.Node(taxid = 21, name = "node21", rank = "rank2", parent = node2)
+        node121 = taxidTools.Node(taxid = 121, name = "node121", rank = "rank3", parent = node12)
+        node122 = taxidTools.Node(taxid = 122, name = "node122", rank = "rank3", parent = node12)
+        self.txd = taxidTools.Taxonomy.from_list([node0, node1, node2, node11, node12,
+                                                   node21, node121, node122])
+        self.txd.addNode(taxidTools.MergedNode(99, 121))
+
+    def test_include_exclude(self):
+        taxids = ["0", "1", "2", "11", "12", "21", "121", "122"]
+        clades = taxidTools.CladeFilter(self.txd, include=[1], exclude=["12"])
+        self.assertEqual(len(clades), 8)
+        self.assertEqual(clades.mask(taxids),
+                         [False, True, False, True, False, False, False, False])
+
+        clades = taxidTools.CladeFilter(self.txd, include=["1", "122"], exclude=["12"])
+        self.assertEqual([t for t, keep in zip(taxids, clades.mask(taxids)) if keep],
+                         ["1", "11", "122"])
+
+        clades = taxidTools.CladeFilter(self.txd, exclude=["12"])
+        self.assertEqual(clades.mask(taxids),
+                         [True, True, True, True, False, True, False, False])
+
+    def test_lookups(self):
+        clades = taxidTools.CladeFilter(self.txd, include=["12"])
+        self.assertIn(121, clades)
+        self.assertIn("99", clades)
+        self.assertNotIn("11", clades)
+        self.assertNotIn("notataxid", clades)
+        self.assertTrue(taxidTools.CladeFilter(self.txd, include=["12"], missing=True)
+                        .mask(["notataxid"])[0])
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            taxidTools.CladeFilter(self.txd, include=["notataxid"])
+
+    def test_filter(self):
+        clades = taxidTools.CladeFilter(self.txd, include=["12"])
+        hits = iter([("read1", 121), ("read2", 11), ("read3", 99), ("read4", "x")])
+        self.assertEqual([read for read, _ in clades.filter(hits, key=lambda hit: hit[1])],
+                         ["read1", "read3"])
+        self.assertEqual(list(clades.filter(["0", "12", 122])), ["12", 122])
+
+    def test_taxdump(self):
+        txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        taxids = list(txd.keys())
+        clades = taxidTools.CladeFilter(txd, include=["9903"])
+        self.assertEqual(clades.mask(taxids),
+                         [txd.isDescendantOf(t, "9903") or txd[t].taxid == "9903"
+                          for t in taxids])
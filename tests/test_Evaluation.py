@@ -0,0 +1,93 @@
+import os
+import unittest
+import taxidTools
+
+
+current_path = os.path.dirname(__file__)
+nodes = os.path.join(current_path, "data", "mininodes.dmp")
+rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
+merged = os.path.join(current_path, "data", "minimerged.dmp")
+
+
+class TestEvaluation(unittest.TestCase):
+    # Test Tree
+    #
+    # 0
+    # |- 1
+    # |  |- 11
+    # |  |- 12
+    # |      |- 121
+    # |      |- 122
+    # |- 2
+    #    |- 21
+
+    def setUp(self):
+        node0 = taxidTools.Node(taxid = 0, name = "root", rank = "root", parent = None)
+        node1 = taxidTools.Node(taxid = 1, name = "node1", rank = "rank1", parent = node0)
+        node2 = taxidTools.Node(taxid = 2, name = "node2", rank = "rank1", parent = node0)
+        node11 = taxidTools.Node(taxid = 11, name = "node11", rank = "rank2", parent = node1)
+        node12 = taxidTools.Node(taxid = 12, name = "node12", rank = "rank2", parent = node1)
+        node21 = taxidTools.Node(taxid = 21, name = "node21", rank = "rank2", parent = node2)
+        node121 = taxidTools.Node(taxid = 121, name = "node121", rank = "rank3", parent = node12)
+        node122 = taxidTools.Node(taxid = 122, name = "node122", rank = "rank3", parent = node12)
+        self.txd = taxidTools.Taxonomy.from_list([node0, node1, node2, node11, node12,
+                                                   node21, node121, node122])
+        self.txd.addNode(taxidTools.MergedNode(99, 121))
+        self.ranks = ['rank3', 'rank2', 'rank1']
+
+    def test_counts(self):
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks)
+        predicted = ['121', '122', '12', '1', '0', '21', None, 99, '11']
+        truth = ['121', '121', '121', '121', '121', '121', '121', '121', '12']
+        self.assertEqual(evaluation.update(predicted, truth), 9)
+        self.assertEqual(len(evaluation), 9)
+        counts = evaluation.counts()
+        # '0' is unclassified by default
+        self.assertEqual(counts['rank3'], {'correct': 2, 'too_shallow': 2,
+                                           'incorrect': 2, 'unclassified': 2})
+        self.assertEqual(counts['rank2'], {'correct': 4, 'too_shallow': 1,
+                                           'incorrect': 2, 'unclassified': 2})
+        self.assertEqual(counts['rank1'], {'correct': 6, 'too_shallow': 0,
+                                           'incorrect': 1, 'unclassified': 2})
+
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks, unclassified=[None])
+        evaluation.update(['0'], ['121'])
+        self.assertEqual(evaluation.counts()['rank1']['too_shallow'], 1)
+
+    def test_metrics(self):
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks, batch_size=2)
+        evaluation.update(iter(['121', '122', '12', '0']), iter(['121'] * 4))
+        evaluation.update(['11'], ['11'])
+        metrics = evaluation.metrics()
+        self.assertEqual(metrics['rank3']['precision'], 0.5)
+        self.assertEqual(metrics['rank3']['recall'], 0.25)
+        self.assertAlmostEqual(metrics['rank3']['f1'], 1 / 3)
+        self.assertEqual(metrics['rank2']['precision'], 1.0)
+        self.assertEqual(metrics['rank2']['recall'], 0.8)
+        self.assertEqual(metrics['rank2']['correct'], 4)
+        self.assertEqual(len(evaluation), 5)
+
+    def test_empty(self):
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks)
+        self.assertEqual(evaluation.metrics()['rank1'],
+                         {'correct': 0, 'too_shallow': 0, 'incorrect': 0, 'unclassified': 0,
+                          'precision': 0.0, 'recall': 0.0, 'f1': 0.0})
+
+    def test_missing(self):
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks)
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            evaluation.update(['121'], ['404'])
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            evaluation.update(['404'], ['121'])
+        evaluation = taxidTools.Evaluation(self.txd, self.ranks, ignore_missing=True)
+        self.assertEqual(evaluation.update(['404', '121'], ['121', '404']), 1)
+        self.assertEqual(evaluation.counts()['rank3']['unclassified'], 1)
+
+    def test_taxdump(self):
+        # Docstring example, with turkey in place of human
+        tax = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        evaluation = taxidTools.Evaluation(tax, ranks=['species', 'genus'])
+        evaluation.update(['9913', '9903', '9103'], ['9913', '9913', '9913'])
+        self.assertEqual(evaluation.counts()['species'],
+                         {'correct': 1, 'too_shallow': 1, 'incorrect': 1, 'unclassified': 0})
+        self.assertAlmostEqual(evaluation.metrics()['genus']['precision'], 2 / 3)
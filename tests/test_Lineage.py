@@ -37,3 +37,15 @@ class TestLineage(unittest.TestCase):
         self.assertEqual(fil3[0], self.rank1)
         self.assertEqual(fil3[1], self.rank3)
         self.assertEqual(fil3[3], self.rank2)
+
+    def test_filter_placeholders(self):
+        fil1 = taxidTools.Lineage(self.rank3)
+        fil1.filter(["rank3", "norank", "rank1"])
+        fil2 = taxidTools.Lineage(self.rank2)
+        fil2.filter(["rank3", "norank", "rank1"])
+        self.assertIsInstance(fil2[0], taxidTools.DummyNode)
+        self.assertEqual(fil2[0].rank, "rank3")
+        # Placeholders are not shared between Lineages
+        self.assertIsNot(fil1[1], fil2[1])
+        self.assertIsNone(fil1[1].parent)
+        self.assertEqual(fil1[1].children, set())
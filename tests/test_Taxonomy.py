@@ -1,15 +1,18 @@
 import os
+import importlib.util
 import unittest
 from tempfile import TemporaryDirectory
 
 
 import taxidTools
+from taxidTools.FuzzyIndex import FuzzyIndex
 
 
 current_path = os.path.dirname(__file__)
 nodes = os.path.join(current_path, "data", "mininodes.dmp")
 rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
 merged = os.path.join(current_path, "data", "minimerged.dmp")
+names = os.path.join(current_path, "data", "mininames.dmp")
 
 
 class TestTaxdump(unittest.TestCase):
@@ -37,6 +40,37 @@ class TestTaxdump(unittest.TestCase):
         self.txd = taxidTools.Taxonomy.from_list([self.parent, self.child])
         self.assertEqual(len(self.txd.keys()), 2)
 
+    def test_factory_arrays(self):
+        self.txd = taxidTools.Taxonomy.from_arrays(
+            ["1", 2, "3", "4"], ["1", "1", 2, "2"], ["root", "genus", "species", "species"],
+            ["root", "Bos", "Bos taurus", None], merged={5: "3", "6": 5},
+            types=[taxidTools.Node] * 3 + [taxidTools.DummyNode])
+        self.assertEqual(len(self.txd), 6)
+        self.assertIsNone(self.txd.root.parent)
+        self.assertEqual(self.txd["3"].parent, self.txd["2"])
+        self.assertEqual(self.txd["2"].children, {self.txd["3"], self.txd["4"]})
+        self.assertIsInstance(self.txd["4"], taxidTools.DummyNode)
+        self.assertEqual(self.txd["6"], self.txd["3"])
+        self.assertEqual(self.txd.getTaxid("bos taurus"), "3")
+
+        frozen = taxidTools.FrozenTaxonomy.from_arrays(["1", "2"], [None, "1"], ["root", "genus"],
+                                                       ["root", "Bos"])
+        self.assertIsInstance(frozen, taxidTools.FrozenTaxonomy)
+        self.assertEqual(frozen["2"].parent.taxid, "1")
+
+        with self.assertRaises(ValueError):
+            taxidTools.Taxonomy.from_arrays(["1", "2"], [None], ["root"], ["root"])
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            taxidTools.Taxonomy.from_arrays(["1", "2"], [None, "3"], ["root"] * 2, ["a", "b"])
+        with self.assertRaises(taxidTools.TaxonomyError):
+            taxidTools.Taxonomy.from_arrays(["1", "1"], [None, "1"], ["root"] * 2, ["a", "b"])
+        with self.assertRaises(taxidTools.TaxonomyError):
+            taxidTools.Taxonomy.from_arrays(["1", "2"], [None, None], ["root"] * 2, ["a", "b"])
+        with self.assertRaises(taxidTools.TaxonomyError):
+            taxidTools.Taxonomy.from_arrays(["1", "2", "3"], [None, "3", "2"], ["root"] * 3, ["a", "b", "c"])
+        with self.assertRaises(taxidTools.TaxonomyError):
+            taxidTools.Taxonomy.from_arrays(["1"], [None], ["root"], ["a"], merged={"1": "1"})
+
     def test_factory_taxdump(self):
         self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
         self.assertEqual(self.txd["9913"].parent.taxid, "9903")
@@ -52,7 +86,8 @@ class TestTaxdump(unittest.TestCase):
         self.txd.write(os.path.join(self.workdir.name, "test.json"))
         self.reload = taxidTools.read_json(os.path.join(self.workdir.name, "test.json"))
 
-        self.assertEqual(self.txd["999999"], self.txd["9103"])
+        self.assertEqual(len(self.reload), len(self.txd))
+        self.assertEqual(self.reload["999999"], self.reload["9103"])
 
         ancestry = taxidTools.Lineage(self.reload["9903"])
         self.assertEqual(len(ancestry), 29)
@@ -64,11 +99,267 @@ class TestTaxdump(unittest.TestCase):
         ancestry = taxidTools.Lineage(test2["9903"])
         self.assertIsInstance(ancestry[1], taxidTools.DummyNode)
 
+    def test_IO_json_legacy(self):
+        # Written by taxidTools 3.1.1, Node 9103 is repeated for merged taxid 999999
+        legacy = taxidTools.read_json(os.path.join(current_path, "data", "legacy.json"))
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage)
+        self.assertEqual(set(legacy.keys()), set(self.txd.keys()))
+        self.assertEqual(legacy.getAncestry("9913")[-1].taxid, "1")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_IO_parquet(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        self.txd.filterRanks(['genus', 'none'])
+        self.txd.addNode(taxidTools.MergedNode(999999, 9903))
+        self.txd.to_parquet(os.path.join(self.workdir.name, "test.parquet"))
+        self.reload = taxidTools.read_parquet(os.path.join(self.workdir.name, "test.parquet"))
+
+        self.assertEqual(len(self.reload), len(self.txd))
+        self.assertEqual(self.reload["999999"], self.reload["9903"])
+        ancestry = taxidTools.Lineage(self.reload["9903"])
+        self.assertEqual([n.taxid for n in ancestry],
+                         [n.taxid for n in taxidTools.Lineage(self.txd["9903"])])
+        self.assertIsInstance(ancestry[1], taxidTools.DummyNode)
+        self.assertEqual(self.reload.getTaxid(self.txd["9903"].name), "9903")
+
+    def test_IO_newick(self):
+        self.assertEqual(self.txd.toNewick(), "(child)root;")
+        self.assertEqual(self.txd.toNewick("taxid"), "(1)0;")
+        with self.assertRaises(ValueError):
+            self.txd.toNewick("rank")
+
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        path = os.path.join(self.workdir.name, "test.nwk")
+        self.txd.write_newick(path, nhx=True)
+        self.reload = taxidTools.read_newick(path)
+        self.assertEqual(len(self.reload), len(self.txd) - 1)  # Without MergedNode
+        for taxid in self.reload:
+            self.assertEqual(self.reload[taxid].name, self.txd[taxid].name)
+            self.assertEqual(self.reload[taxid].rank, self.txd[taxid].rank)
+        self.assertEqual([n.taxid for n in taxidTools.Lineage(self.reload["9913"])],
+                         [n.taxid for n in taxidTools.Lineage(self.txd["9913"])])
+
+        self.txd.write_newick(path, names="taxid")
+        self.reload = taxidTools.read_newick(path, names="taxid")
+        self.assertEqual(self.reload["9913"].parent.taxid, "9903")
+        self.assertEqual(self.reload["9913"].rank, "no rank")
+
+    def test_newick_quoting(self):
+        self.child.name = "child (x, y) 'z'_1"
+        self.txd = taxidTools.Taxonomy.from_list([self.parent, self.child])
+        self.assertEqual(self.txd.toNewick(), "('child (x, y) ''z''_1')root;")
+        path = os.path.join(self.workdir.name, "test.nwk")
+        with open(path, "w") as fi:
+            self.txd.write_newick(fi, quote=True, nhx=True)
+        with open(path) as fi:
+            self.assertEqual(fi.read(), "('child (x, y) ''z''_1'[&&NHX:taxid=1:rank=child])"
+                                        "'root'[&&NHX:taxid=0:rank=root];")
+        self.assertEqual(taxidTools.read_newick(path)["1"].name, "child (x, y) 'z'_1")
+
+        with open(path, "w") as fi:
+            fi.write("((A_b:0.1,C[comment]:0.2)D, 'E F'\n)G;")
+        self.reload = taxidTools.read_newick(path)
+        self.assertEqual(self.reload["A b"].parent.taxid, "D")
+        self.assertEqual(self.reload["E F"].parent.taxid, "G")
+
+        for invalid in ["((A,B)C;", "(A,B))C;", "(A,)C;"]:
+            with open(path, "w") as fi:
+                fi.write(invalid)
+            with self.assertRaises(ValueError):
+                taxidTools.read_newick(path)
+        with open(path, "w") as fi:
+            fi.write("(A,A)C;")
+        with self.assertRaises(taxidTools.TaxonomyError):
+            taxidTools.read_newick(path)
+
+    def test_write_report(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        path = os.path.join(self.workdir.name, "report.txt")
+        self.txd.write_report(path, iter(["9913", "9913", 9903, 0, "999999"]))
+        with open(path) as fi:
+            lines = [line.rstrip("\n").split("\t") for line in fi]
+
+        self.assertEqual(lines[0], [" 20.00", "1", "1", "U", "0", "unclassified"])
+        self.assertEqual(lines[1], [" 80.00", "4", "0", "R", "1", "root"])
+        self.assertEqual(lines[2][3:], ["R1", "131567", "  cellular organisms"])
+        bos = [line for line in lines if line[4] == "9903"][0]
+        self.assertEqual(bos[:4], [" 60.00", "3", "1", "G"])
+        # Largest clades come first
+        taxids = [line[4] for line in lines]
+        self.assertLess(taxids.index("9913"), taxids.index("9103"))
+        self.assertEqual(lines[-1][4], "9103")
+
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            self.txd.write_report(path, ["9913", "notataxid"])
+
+    def test_lineage_table(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        ranks = taxidTools.linne()
+        table = list(self.txd.lineage_table(ranks))
+        self.assertEqual(len(table), len(set(self.txd.values())))
+        for row in table:
+            lineage = taxidTools.Lineage(self.txd[row[0]])
+            lineage.filter(ranks)
+            self.assertEqual(list(row[1:]),
+                             [None if isinstance(n, taxidTools.DummyNode) else n.name
+                              for n in lineage])
+
+        rows = list(self.txd.lineage_table(["species", "genus"], taxids=[9913, "999999", "notataxid"],
+                                           fmt="taxids"))
+        self.assertEqual(rows[0], ("9913", "9913", "9903"))
+        self.assertEqual(rows[1][0], "999999")
+        self.assertEqual(rows[2], ("notataxid", None, None))
+        with self.assertRaises(ValueError):
+            next(self.txd.lineage_table(fmt="ranks"))
+
+        path = os.path.join(self.workdir.name, "lineages.csv")
+        self.txd.write_lineage_table(path, ["species", "genus"], taxids=["9913"])
+        with open(path) as fi:
+            self.assertEqual(fi.read(), "taxid,species,genus\n9913,Bos taurus,Bos\n")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow not installed")
+    def test_lineage_table_parquet(self):
+        import pyarrow.parquet as pq
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        path = os.path.join(self.workdir.name, "lineages.parquet")
+        self.txd.write_lineage_table(path)
+        table = pq.read_table(path)
+        self.assertEqual(table.column_names, ["taxid"] + taxidTools.linne())
+        self.assertEqual(table.to_pylist(), [dict(zip(table.column_names, row))
+                                             for row in self.txd.lineage_table()])
+
+    def test_memory_usage(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        shallow = self.txd.memory_usage(deep=False)
+        self.assertEqual(set(shallow), {"data", "name_index", "redirects", "total"})
+        usage = self.txd.memory_usage()
+        self.assertEqual(usage["name_index"], shallow["name_index"])
+        for key in ["nodes", "children", "taxids", "names", "ranks", "merged"]:
+            self.assertGreater(usage[key], 0)
+        self.assertEqual(usage["total"], sum(v for k, v in usage.items() if k != "total"))
+        self.assertGreater(usage["total"], shallow["total"])
+
+    def test_generation(self):
+        generation = self.txd.generation
+        self.assertEqual(self.txd.root, self.parent)
+        self.assertIs(self.txd.root, self.txd._derived["root"])
+
+        new_root = taxidTools.Node(taxid = 2, name = "new", rank = "root")
+        self.parent.parent = new_root
+        self.txd.addNode(new_root)
+        self.assertGreater(self.txd.generation, generation)
+        self.assertEqual(self.txd.root, new_root)
+
+        # the fuzzy index is rebuilt with the new names
+        self.assertEqual(self.txd.getTaxid("chidl", fuzzy=True), "1")
+        self.txd.addNode(taxidTools.Node(taxid = 3, name = "chilly", rank = "rank", parent = new_root))
+        self.assertNotIn("fuzzy_index", self.txd._derived)
+        self.assertEqual(self.txd.getTaxid("chily", fuzzy=True), "3")
+        del self.txd["3"]
+
+        generation = self.txd.generation
+        self.txd.getAncestry(1)
+        self.assertEqual(self.txd.generation, generation)
+        del self.txd["2"]
+        self.assertGreater(self.txd.generation, generation)
+
+        generation = self.txd.generation
+        self.txd.data = dict(self.txd.data)
+        self.assertGreater(self.txd.generation, generation)
+
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        generation = self.txd.generation
+        self.txd.filterRanks()
+        self.assertGreater(self.txd.generation, generation)
+        generation = self.txd.generation
+        self.txd.prune("9913")
+        self.assertGreater(self.txd.generation, generation)
+        self.assertEqual(self.txd.root.taxid, "1")
+
     def test_getters(self):
         self.assertEqual(self.txd.getName(1), "child")
         self.assertEqual(self.txd.getRank(1), "child")
         self.assertEqual(self.txd.getParent(1).taxid, "0")
 
+    def test_batch_getters(self):
+        self.txd.addNode(taxidTools.MergedNode(2, 1))
+        self.assertEqual(self.txd.getNames([1, "0", "2", "notataxid"]),
+                         ["child", "root", "child", None])
+        self.assertEqual(self.txd.getRanks(["1", "notataxid"], value="NA"),
+                         ["child", "NA"])
+        self.assertEqual(self.txd.getParents(["1", "0"]), [self.parent, None])
+        self.assertEqual(self.txd.getTaxids(["child", "notaname"]), ["1", None])
+
+    def test_name_index(self):
+        self.txd.addNode(taxidTools.Node(taxid = 2, name = "Child", rank = "child", parent = self.parent))
+        self.txd.addNode(taxidTools.Node(taxid = 3, name = "child  two", rank = "child", parent = self.parent))
+        self.assertEqual(self.txd.getTaxid("Child"), "2")
+        self.assertEqual(self.txd.getTaxid(" CHILD "), "1")
+        self.assertEqual(self.txd.find_taxids("Child"), ["2", "1"])
+        self.assertEqual(self.txd.getTaxids(["child Two", "notaname"]), ["3", None])
+        self.assertEqual(self.txd.search_names("CH"),
+                         [("child", "1"), ("Child", "2"), ("child  two", "3")])
+        self.assertEqual(self.txd.search_names("child "), [("child  two", "3")])
+        self.assertEqual(self.txd.search_names("ch", limit=1), [("child", "1")])
+
+        # Removed or renamed Nodes are not returned
+        del self.txd["2"]
+        self.txd["3"].name = "renamed"
+        self.assertEqual(self.txd.find_taxids("child"), ["1"])
+        self.assertIsNone(self.txd.getTaxid("child two"))
+        self.assertEqual(self.txd.search_names("ch"), [("child", "1")])
+
+    def test_names_dmp(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged, names=names)
+        self.assertEqual(self.txd.getTaxid("Bos taurus"), "9913")
+        self.assertEqual(self.txd.getTaxid("bos bovis"), "9913")
+        self.assertEqual(self.txd.find_taxids("cattle"), ["9913", "9903"])
+        self.assertEqual(self.txd.getTaxid("cattle", name_class="common name"), "9903")
+        self.assertIsNone(self.txd.getTaxid("cattle", name_class="scientific name"))
+        self.assertEqual(self.txd.getTaxids(["zebu", "human"]), ["9915", None])
+
+        # Other names are kept in copies and pruned with their Nodes
+        self.assertEqual(self.txd.copy().getTaxid("zebu"), "9915")
+        self.assertEqual(self.txd.freeze().getTaxid("zebu"), "9915")
+        pruned = self.txd.prune("9915", inplace=False)
+        self.assertEqual(pruned.find_taxids("cattle"), ["9903"])
+
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, names=names,
+                                           name_classes=["synonym"])
+        self.assertEqual(self.txd.getTaxid("Bos primigenius taurus"), "9913")
+        self.assertIsNone(self.txd.getTaxid("cattle"))
+
+    def test_fuzzy_names(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged, names=names)
+        self.assertIsNone(self.txd.getTaxid("Bos tarus"))
+        self.assertEqual(self.txd.getTaxid("Bos tarus", fuzzy=True), "9913")
+        self.assertEqual(self.txd.getTaxid("Bos torus", fuzzy=True), "9913")
+        self.assertIsNone(self.txd.getTaxid("Bos torus", fuzzy=True, max_distance=1))
+        self.assertEqual(self.txd.getTaxids(["Bos indicus", "Bos indics", "catle", "xyz"], fuzzy=True),
+                         ["9915", "9915", "9913", None])
+        self.assertEqual(self.txd.getTaxid("catle", fuzzy=True, name_class="common name"), "9903")
+        self.assertEqual(self.txd.fuzzy_matches("bos tarus", max_distance=1),
+                         [("bos taurus", "9913", 1)])
+        self.assertEqual(self.txd.fuzzy_matches("catle", limit=1), [("cattle", "9913", 1)])
+
+        path = os.path.join(self.workdir.name, "fuzzy.json")
+        self.txd.write_fuzzy_index(path)
+        self.reload = taxidTools.read_taxdump(nodes, rankedlineage, merged, names=names)
+        self.reload.read_fuzzy_index(path)
+        self.assertEqual(self.reload.fuzzy_matches("Bos tarus"), self.txd.fuzzy_matches("Bos tarus"))
+
+        # The index is rebuilt when names are added
+        self.txd.addNode(taxidTools.Node(1234567, "Bos tarus", "species", self.txd["9903"]))
+        self.assertEqual(self.txd.fuzzy_matches("Bos tarus", max_distance=0),
+                         [("bos tarus", "1234567", 0)])
+
+    def test_fuzzy_short_names(self):
+        # Short queries can match names sharing no trigram with them
+        index = FuzzyIndex(["ab", "cab", "dab", "abd", "bo", "gallus gallus"])
+        self.assertEqual(index.search("eabc"), [("ab", 2), ("abd", 2), ("cab", 2), ("dab", 2)])
+        self.assertEqual(index.search("zos"), [("bo", 2)])
+        self.assertEqual(index.search("zos", max_distance=1), [])
+
     def test_getAncestry(self):
         lin = self.txd.getAncestry(1)
         self.assertEqual(len(lin), 2)
@@ -102,3 +393,27 @@ class TestTaxdump(unittest.TestCase):
         # assign a non-existing node and raise anerror
         self.merged = taxidTools.MergedNode(11, 99)
         self.assertRaises(taxidTools.InvalidNodeError, self.txd.__getitem__, "11")
+
+    def test_merged_chain(self):
+        self.txd = taxidTools.Taxonomy.from_list([self.parent, self.child,
+                                                  taxidTools.MergedNode(10, 11),
+                                                  taxidTools.MergedNode(11, 1)])
+        self.assertEqual(self.txd['10'], self.child)
+        self.assertEqual(self.txd.resolve(['10', '11']), ['1', '1'])
+        # Merging an existing target keeps the redirections up to date
+        self.txd.addNode(taxidTools.MergedNode(1, 0))
+        self.assertEqual(self.txd['10'], self.parent)
+        self.assertEqual(self.txd.resolve(['10']), ['0'])
+        # Replacing a merged taxid by a real node ends the chains through it
+        new = taxidTools.Node(11, parent=self.parent)
+        self.txd.addNode(new)
+        self.assertEqual(self.txd['11'], new)
+        self.assertEqual(self.txd['10'], new)
+        self.assertEqual(self.txd.resolve(['10', '11']), ['11', '11'])
+        self.assertNotIn('11', self.txd._merged)
+
+    def test_resolve(self):
+        self.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        self.assertEqual(self.txd.resolve([9913, "999999", "notataxid"]),
+                         ["9913", "9103", None])
+        self.assertEqual(self.txd.resolve(["notataxid"], value="0"), ["0"])
@@ -0,0 +1,77 @@
+import io
+import os
+import shutil
+import unittest
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+
+
+from taxidTools import cli
+
+
+current_path = os.path.dirname(__file__)
+data = os.path.join(current_path, "data")
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = TemporaryDirectory()
+        self.taxdump = os.path.join(self.workdir.name, "taxdump")
+        os.mkdir(self.taxdump)
+        for src, dest in [("mininodes.dmp", "nodes.dmp"),
+                          ("minirankedlineage.dmp", "rankedlineage.dmp"),
+                          ("minimerged.dmp", "merged.dmp")]:
+            shutil.copy(os.path.join(data, src), os.path.join(self.taxdump, dest))
+        self.cache = os.path.join(self.workdir.name, "cache.json")
+        self.input = os.path.join(self.workdir.name, "input.txt")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def run_cli(self, lines, *args):
+        with open(self.input, "w") as fi:
+            fi.write("\n".join(lines) + "\n")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            cli.main(["--taxdump", self.taxdump, "--cache", self.cache] + list(args) + [self.input])
+        return [line.split("\t") for line in out.getvalue().splitlines()]
+
+    def test_cache(self):
+        self.run_cli(["9913"], "lineage")
+        self.assertTrue(os.path.exists(self.cache))
+        tax = cli.load_taxonomy(taxdump=self.taxdump, cache=self.cache)
+        self.assertEqual(tax.getName(9913), "Bos taurus")
+
+    def test_lineage(self):
+        res = self.run_cli(["9913", "999999", "notataxid"], "lineage", "--ranks", "species,genus,family")
+        self.assertEqual(res[0], ["9913", "Bos taurus", "Bos", "Bovidae"])
+        self.assertEqual(res[1], ["999999", "Meleagris gallopavo", "Meleagris", "Phasianidae"])
+        self.assertEqual(res[2], ["notataxid", "", "", ""])
+        res = self.run_cli(["9913"], "lineage", "--format", "taxids")
+        self.assertTrue(res[0][1].startswith("1;131567;"))
+        self.assertTrue(res[0][1].endswith(";9903;9913"))
+
+    def test_lca(self):
+        res = self.run_cli(["9913 9103", "9913,9915", "9913 notataxid"], "lca")
+        self.assertEqual(res[0][1:], ["32524", "Amniota", "clade"])
+        self.assertEqual(res[1][1:], ["9903", "Bos", "genus"])
+        self.assertEqual(res[2][1:], ["", "", ""])
+        res = self.run_cli(["9913 notataxid"], "lca", "--ignore-missing")
+        self.assertEqual(res[0][1], "9913")
+
+    def test_consensus(self):
+        res = self.run_cli(["9913 9913 9103"], "consensus", "-m", "0.6")
+        self.assertEqual(res[0][1:], ["9913", "Bos taurus", "species"])
+
+    def test_name2taxid(self):
+        res = self.run_cli(["Bos taurus", "notaname"], "name2taxid")
+        self.assertEqual(res, [["Bos taurus", "9913"], ["notaname", ""]])
+
+    def test_rank_at(self):
+        res = self.run_cli(["9913", "notataxid"], "rank-at", "--rank", "family")
+        self.assertEqual(res, [["9913", "9895", "Bovidae"], ["notataxid", "", ""]])
+
+    def test_descendants(self):
+        res = self.run_cli(["9903"], "descendants")
+        self.assertCountEqual([r[1] for r in res], ["9913", "9915"])
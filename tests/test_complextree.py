@@ -111,6 +111,57 @@ class TestComplexTree(unittest.TestCase):
         self.assertEqual(self.txd.distance("11", "1"), 1)
         self.assertEqual(self.txd.distance("121", "22"), 5)
 
+    def test_rollup(self):
+        counts = self.txd.rollup(["121", "121", "122", "12", "22", "0"])
+        self.assertEqual(counts["121"], (2, 2))
+        self.assertEqual(counts["12"], (1, 4))
+        self.assertEqual(counts["1"], (0, 4))
+        self.assertEqual(counts["2"], (0, 1))
+        self.assertEqual(counts["0"], (1, 6))
+        self.assertNotIn("11", counts)
+        # Children are reported before their parents
+        order = list(counts)
+        self.assertLess(order.index("121"), order.index("12"))
+        self.assertLess(order.index("12"), order.index("1"))
+
+        self.assertEqual(self.txd.rollup({"121": 2, 122: 1}),
+                         self.txd.rollup(["121", "122"], counts=[2, 1]))
+
+        counts = self.txd.rollup({"121": 2, "12": 1, "22": 1}, ranks=["rank3", "rank1"])
+        self.assertEqual(set(counts), {"121", "1", "2", "0"})
+        self.assertEqual(counts["1"], (1, 3))
+        self.assertEqual(counts["2"], (1, 1))
+        self.assertEqual(counts["0"], (0, 4))
+
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            self.txd.rollup(["121", "notataxid"])
+        self.assertEqual(self.txd.rollup(["121", "notataxid"], ignore_missing=True)["0"], (0, 1))
+
+    def test_match_expected(self):
+        observed = ["121", "12", "1", "22", "0", "11"]
+        matches = self.txd.match_expected(observed, ["122", 21])
+        self.assertEqual(matches, [("122", 2, "rank2"),
+                                   ("122", 1, "rank2"),
+                                   ("122", 2, "rank1"),
+                                   ("21", 2, "rank1"),
+                                   ("21", 2, "root"),
+                                   ("122", 3, "rank1")])
+        for taxid, (expected, distance, rank) in zip(observed, matches):
+            self.assertEqual(distance, self.txd.distance(taxid, expected))
+
+        # Ties go to the deepest common ancestor, then to the first expected taxid
+        self.assertEqual(self.txd.match_expected(["0"], ["21", "11"]), [("21", 2, "root")])
+        self.assertEqual(self.txd.match_expected(["12"], ["2", "121"]), [("121", 1, "rank2")])
+
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            self.txd.match_expected(["121", "notataxid"], ["122"])
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            self.txd.match_expected(["121"], ["122", "notataxid"])
+        self.assertEqual(self.txd.match_expected(["notataxid", "121"], ["notataxid", "121"],
+                                                 ignore_missing=True),
+                         [None, ("121", 0, "rank3")])
+        self.assertEqual(self.txd.match_expected(["121"], []), [None])
+
     def test_listDescendant(self):
         self.assertSetEqual(set(self.txd.listDescendant(1)),
                             set([self.node11, self.node12, self.node121, self.node122]))
@@ -129,11 +180,101 @@ class TestComplexTree(unittest.TestCase):
         self.assertSetEqual(set(ids), {"0", "1", "12", "121"})
         ids = [node.taxid for node in self.txd.values()]
         self.assertSetEqual(set(ids), {"0", "1", "11", "12", "121", "122"})
+        self.assertEqual(self.node1.children, {self.node11, self.node12})
 
         self.txd.prune(11)
         ids = [node.taxid for node in self.txd.values()]
         self.assertSetEqual(set(ids), {"11", "1", "0"})
 
+    def test_subtree(self):
+        self.txd.addNode(taxidTools.MergedNode(99, 121))
+        self.txd.addNode(taxidTools.MergedNode(98, 23))
+        sub = self.txd.subtree(["121", 99, "11"])
+        self.assertSetEqual(set(sub.data), {"0", "1", "11", "12", "121", "99"})
+        self.assertEqual(sub["99"].taxid, "121")
+        self.assertIsNot(sub["121"], self.node121)
+        self.assertEqual({node.taxid for node in sub["12"].children}, {"121"})
+        self.assertEqual(sub.root.taxid, "0")
+        self.assertEqual(sub.getTaxid("node121"), "121")
+        # Original left unchanged
+        self.assertEqual(len(self.txd), 12)
+        self.assertEqual(self.node12.children, {self.node121, self.node122})
+
+        sub = self.txd.subtree(["12", "22"], keep_descendants=True)
+        self.assertSetEqual(set(sub.data), {"0", "1", "2", "12", "121", "122", "22", "99"})
+
+        with self.assertRaises(taxidTools.InvalidNodeError):
+            self.txd.subtree(["121", "404"])
+        sub = self.txd.subtree(["121", "404"], ignore_missing=True)
+        self.assertEqual(len(sub), 5)
+
+        frozen = self.txd.freeze()
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.subtree(["121"], inplace=True)
+        self.assertNotIsInstance(frozen.subtree(["121"]), taxidTools.FrozenTaxonomy)
+
+        self.assertIsNone(self.txd.subtree(["21", "122"], inplace=True))
+        self.assertSetEqual(set(self.txd.data), {"0", "1", "2", "12", "21", "122"})
+        self.assertEqual(self.node0.children, {self.node1, self.node2})
+        self.assertEqual(self.node12.children, {self.node122})
+        self.assertIsNone(self.txd.getTaxid("node121"))
+
+    def test_freeze(self):
+        frozen = self.txd.freeze()
+        self.assertIsInstance(frozen, taxidTools.FrozenTaxonomy)
+        self.assertIs(frozen.freeze(), frozen)
+        self.assertEqual(frozen.lca(["121", "11"]).taxid, "1")
+        self.assertIsNot(frozen["1"], self.node1)
+        self.assertEqual(frozen["1"].children, {frozen["11"], frozen["12"]})
+
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.addNode(taxidTools.Node(3, parent=self.node0))
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen["3"] = taxidTools.Node(3)
+        with self.assertRaises(TypeError):
+            del frozen["1"]
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.prune(1)
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.filterRanks(["rank1"])
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.data = {}
+        with self.assertRaises(taxidTools.FrozenTaxonomyError):
+            frozen.set_accession_index(None)
+
+        pruned = frozen.prune(12, inplace=False)
+        self.assertNotIsInstance(pruned, taxidTools.FrozenTaxonomy)
+        self.assertSetEqual(set(pruned.keys()), {"0", "1", "12", "121", "122"})
+        self.assertEqual(len(frozen), 10)
+        self.assertEqual(len(frozen["1"].children), 2)
+        self.assertEqual(len(frozen.filterRanks(["rank1"], inplace=False)), 3)
+        self.assertEqual(len(frozen), 10)
+
+        # Hashable and versioned
+        self.assertEqual(hash(frozen), hash(frozen))
+        self.assertEqual({frozen: 1}[frozen], 1)
+        other = self.txd.freeze()
+        self.assertNotEqual(frozen.version, other.version)
+        with self.assertRaises(TypeError):
+            hash(self.txd)
+
+        # Without copy, the Taxonomy hands its Nodes over
+        adopted = self.txd.freeze(copy=False)
+        self.assertIs(adopted["1"], self.node1)
+        self.assertEqual(len(self.txd), 0)
+        self.txd.addNode(taxidTools.Node(3))
+        self.assertNotIn("3", adopted)
+        self.assertEqual(len(adopted), len(frozen))
+
+    def test_freeze_threads(self):
+        from concurrent.futures import ThreadPoolExecutor
+        frozen = self.txd.freeze(copy=False)
+        groups = [["121", "122"], ["11", "121"], ["21", "22", "23"], ["11", "22"]] * 250
+        expected = ["12", "1", "2", "0"] * 250
+        with ThreadPoolExecutor(8) as pool:
+            res = list(pool.map(lambda g: frozen.lca(g).taxid, groups))
+        self.assertEqual(res, expected)
+
     def test_filter(self):
         node001 = taxidTools.Node('001', name = "node001", rank = "rank3", parent = self.node0)
         self.txd.addNode(node001)
@@ -0,0 +1,59 @@
+import os
+import unittest
+
+
+import taxidTools
+from taxidTools import instrumentation
+
+
+current_path = os.path.dirname(__file__)
+nodes = os.path.join(current_path, "data", "mininodes.dmp")
+rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+        self.events = []
+        self.sink = lambda *args: self.events.append(args)
+        instrumentation.add_sink(self.sink)
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.remove_sink(self.sink)
+        instrumentation.reset()
+
+    def test_disabled(self):
+        self.assertFalse(instrumentation.is_enabled())
+        txd = taxidTools.read_taxdump(nodes, rankedlineage)
+        txd.getAncestry(9913)
+        self.assertEqual(instrumentation.get_stats(), {})
+        self.assertEqual(self.events, [])
+
+    def test_enabled(self):
+        instrumentation.enable()
+        txd = taxidTools.read_taxdump(nodes, rankedlineage)
+        txd.getAncestry(9913)
+        txd.lca([9913, 9103])
+        stats = taxidTools.Taxonomy.stats()
+        self.assertEqual(stats["read_taxdump"]["calls"], 1)
+        self.assertEqual(stats["read_taxdump"]["items"], len(txd))
+        self.assertEqual(stats["Taxonomy.getAncestry"]["items"], 30)
+        self.assertEqual(stats["Taxonomy.lca"]["items"], 2)
+        self.assertEqual(stats["Taxonomy.consensus"]["calls"], 1)
+        self.assertNotIn("Lineage.__init__", stats)
+        self.assertIn(("Taxonomy.lca", stats["Taxonomy.lca"]["time"], 2), self.events)
+
+    def test_profile(self):
+        txd = taxidTools.read_taxdump(nodes, rankedlineage)
+        instrumentation.enable()
+        txd.getAncestry(9913)
+        instrumentation.disable()
+        with instrumentation.profile() as stats:
+            txd.getAncestry(9913)
+            txd.getAncestry(9903)
+        self.assertFalse(instrumentation.is_enabled())
+        self.assertEqual(stats["Taxonomy.getAncestry"]["calls"], 2)
+        self.assertEqual(stats["Taxonomy.getAncestry"]["items"], 59)
+        self.assertEqual(taxidTools.Taxonomy.stats()["Taxonomy.getAncestry"]["calls"], 3)
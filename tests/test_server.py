@@ -0,0 +1,95 @@
+import asyncio
+import os
+import threading
+import unittest
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+
+import taxidTools
+from taxidTools import server
+from taxidTools.server import TaxonomyClient, start_server
+
+
+current_path = os.path.dirname(__file__)
+nodes = os.path.join(current_path, "data", "mininodes.dmp")
+rankedlineage = os.path.join(current_path, "data", "minirankedlineage.dmp")
+merged = os.path.join(current_path, "data", "minimerged.dmp")
+
+
+class TestServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.workdir = TemporaryDirectory()
+        cls.path = os.path.join(cls.workdir.name, "taxidtools.sock")
+        cls.txd = taxidTools.read_taxdump(nodes, rankedlineage, merged)
+        cls.loop = asyncio.new_event_loop()
+        cls.server = cls.loop.run_until_complete(start_server(cls.txd, cls.path, limit=10000))
+        cls.thread = threading.Thread(target=cls.loop.run_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.call_soon_threadsafe(cls.loop.stop)
+        cls.thread.join()
+        cls.server.close()
+        cls.loop.run_until_complete(cls.server.wait_closed())
+        cls.loop.close()
+        cls.workdir.cleanup()
+
+    def test_queries(self):
+        with TaxonomyClient(self.path) as client:
+            self.assertEqual(client.names([9913, "999999", "notataxid"]),
+                             ["Bos taurus", "Meleagris gallopavo", None])
+            self.assertEqual(client.ranks(["9903"]), ["genus"])
+            self.assertEqual(client.taxids(["Bos"]), ["9903"])
+            self.assertEqual(client.lineage(["9913"], ranks=["species", "genus", "kingdom", "none"]),
+                             [["9913", "9903", "33208", None]])
+            self.assertEqual(len(client.lineage(["9913", "notataxid"])[0]), 30)
+            self.assertIsNone(client.lineage(["notataxid"])[0])
+            self.assertEqual(client.lca([["9913", "9915"], ["9913", "9103"]]), ["9903", "32524"])
+            self.assertEqual(client.consensus([["9913", "9913", "9103"]], 0.6), ["9913"])
+            self.assertEqual(client.resolve([9913, "999999", "notataxid"]),
+                             ["9913", "9103", None])
+            with self.assertRaises(taxidTools.TaxonomyError):
+                client.query("notanoperation")
+            # connection is still usable after an error
+            self.assertEqual(client.ranks(["9913"]), ["species"])
+
+    def test_concurrent_clients(self):
+        results = []
+
+        def query():
+            with TaxonomyClient(self.path) as client:
+                for i in range(20):
+                    results.append(client.lca([["9913", "9915"]])[0])
+
+        threads = [threading.Thread(target=query) for i in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ["9903"] * 100)
+
+    def test_errors(self):
+        def fail(tax):
+            raise RuntimeError("unexpected")
+
+        with TaxonomyClient(self.path) as client:
+            with patch.dict(server._OPERATIONS, {'fail': fail}):
+                with self.assertRaisesRegex(taxidTools.TaxonomyError, "unexpected"):
+                    client.query('fail')
+            with self.assertRaisesRegex(taxidTools.TaxonomyError, "limit"):
+                client.names(["9913"] * 10000)
+            # connection is still usable after an error
+            self.assertEqual(client.names(["9913"]), ["Bos taurus"])
+
+    def test_frozen(self):
+        # The server answers from a frozen copy of the Taxonomy
+        self.txd.addNode(taxidTools.Node(1234567, "new", "species", self.txd["9913"]))
+        try:
+            with TaxonomyClient(self.path) as client:
+                self.assertEqual(client.names(["1234567"]), [None])
+        finally:
+            del self.txd["1234567"]
@@ -0,0 +1,50 @@
+import os
+import unittest
+from tempfile import TemporaryDirectory
+
+
+import taxidTools
+from taxidTools.synthetic import generate_taxonomy
+
+
+class TestSynthetic(unittest.TestCase):
+
+    def setUp(self):
+        self.workdir = TemporaryDirectory()
+        self.txd = generate_taxonomy(500, seed=1)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_generate(self):
+        nodes = [node for node in self.txd.data.values()
+                 if isinstance(node, taxidTools.Node)]
+        self.assertEqual(len(nodes), 500)
+        self.assertEqual(self.txd.root.taxid, "1")
+        ranks = {node.rank for node in nodes}
+        self.assertTrue(set(taxidTools.linne()[:-1]).issubset(ranks))
+        self.assertIn("no rank", ranks)
+        self.assertEqual(len(self.txd) - len(nodes), 25)
+        for node in nodes:
+            self.assertLessEqual(len(self.txd.getAncestry(node.taxid)), 41)
+
+    def test_deterministic(self):
+        other = generate_taxonomy(500, seed=1)
+        self.assertEqual(set(self.txd.keys()), set(other.keys()))
+        self.assertEqual([self.txd.getName(k) for k in self.txd.keys()],
+                         [other.getName(k) for k in self.txd.keys()])
+        self.assertNotEqual(set(self.txd.keys()),
+                            set(generate_taxonomy(500, seed=2).keys()))
+
+    def test_write_taxdump(self):
+        paths = [os.path.join(self.workdir.name, f)
+                 for f in ["nodes.dmp", "rankedlineage.dmp", "merged.dmp"]]
+        self.txd.write_taxdump(*paths)
+        reload = taxidTools.read_taxdump(*paths)
+        self.assertEqual(len(reload), len(self.txd))
+        for taxid in self.txd.keys():
+            self.assertEqual(reload[taxid].taxid, self.txd[taxid].taxid)
+            self.assertEqual(reload.getName(taxid), self.txd.getName(taxid))
+            self.assertEqual(reload.getRank(taxid), self.txd.getRank(taxid))
+            self.assertEqual([n.taxid for n in reload.getAncestry(taxid)],
+                             [n.taxid for n in self.txd.getAncestry(taxid)])